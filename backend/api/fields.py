@@ -0,0 +1,138 @@
+import binascii
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image, ImageFile
+from rest_framework import serializers
+
+from recipes.constants import (
+    IMAGE_DECODE_CHUNK_SIZE,
+    IMAGE_DIMENSION_VALIDATION_MESSAGE,
+    IMAGE_INVALID_MESSAGE,
+    IMAGE_MAX_DIMENSION,
+    IMAGE_MAX_SIZE,
+    IMAGE_SIZE_VALIDATION_MESSAGE
+)
+from recipes.images import get_variant_url
+
+BASE64_SEPARATOR = ';base64,'
+IMAGE_ERRORS = (binascii.Error, OSError, SyntaxError, ValueError)
+
+
+def build_absolute_url(request, url):
+    if request is None or not url:
+        return url
+    return request.build_absolute_uri(url)
+
+
+class PrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class StreamingBase64ImageField(Base64ImageField):
+    def validate_header(self, image):
+        if image.format is None or (
+            image.format.lower() not in self.ALLOWED_TYPES
+        ):
+            raise serializers.ValidationError(self.INVALID_TYPE_MESSAGE)
+        if max(image.size) > IMAGE_MAX_DIMENSION:
+            raise serializers.ValidationError(
+                IMAGE_DIMENSION_VALIDATION_MESSAGE
+            )
+
+    def decode(self, data, start, file):
+        parser = ImageFile.Parser()
+        carry = ''
+        for offset in range(start, len(data), IMAGE_DECODE_CHUNK_SIZE):
+            chunk = carry + ''.join(
+                data[offset:offset + IMAGE_DECODE_CHUNK_SIZE].split()
+            )
+            aligned = len(chunk) - len(chunk) % 4
+            carry = chunk[aligned:]
+            decoded = binascii.a2b_base64(chunk[:aligned])
+            file.write(decoded)
+            if parser.image is None:
+                parser.feed(decoded)
+                if parser.image is not None:
+                    self.validate_header(parser.image)
+        if carry or parser.image is None:
+            raise serializers.ValidationError(IMAGE_INVALID_MESSAGE)
+        return parser.image
+
+    def to_internal_value(self, data):
+        if data in self.EMPTY_VALUES:
+            return None
+        if not isinstance(data, str):
+            raise serializers.ValidationError(IMAGE_INVALID_MESSAGE)
+
+        content_type = None
+        start = data.find(BASE64_SEPARATOR)
+        if start == -1:
+            start = 0
+        else:
+            if self.trust_provided_content_type:
+                content_type = data[:start].replace('data:', '')
+            start += len(BASE64_SEPARATOR)
+        if (len(data) - start) // 4 * 3 > IMAGE_MAX_SIZE:
+            raise serializers.ValidationError(IMAGE_SIZE_VALIDATION_MESSAGE)
+
+        file = SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        try:
+            image = self.decode(data, start, file)
+            size = file.tell()
+            file.seek(0)
+            Image.open(file).verify()
+        except IMAGE_ERRORS:
+            file.close()
+            raise serializers.ValidationError(IMAGE_INVALID_MESSAGE)
+        except serializers.ValidationError:
+            file.close()
+            raise
+        file.seek(0)
+        return serializers.FileField.to_internal_value(self, UploadedFile(
+            file,
+            name=f'{self.get_file_name(None)}.{image.format.lower()}',
+            content_type=content_type or Image.MIME.get(image.format),
+            size=size
+        ))
+
+
+class VariantImageField(StreamingBase64ImageField):
+    def __init__(self, *args, variant=None, **kwargs):
+        self.variant = variant
+        super().__init__(*args, **kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return build_absolute_url(
+            self.context.get('request'),
+            get_variant_url(value, self.variant)
+        )
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    def __init__(self, variants, **kwargs):
+        self.variants = variants
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return {}
+        request = self.context.get('request')
+        return {
+            variant: build_absolute_url(
+                request, get_variant_url(value, variant)
+            )
+            for variant in self.variants
+        }
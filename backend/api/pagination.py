@@ -1,7 +1,38 @@
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    page_size = settings.PAGE_SIZE
+    page_size_query_param = 'limit'
+    ordering = ('-pub_date', '-id')
+
+
+class UserCursorPagination(RecipeCursorPagination):
+    ordering = ('username',)
 
 
 class RecipePagination(PageNumberPagination):
     page_size = settings.PAGE_SIZE
     page_size_query_param = 'limit'
+    cursor_pagination_class = RecipeCursorPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.cursor_pagination_class.cursor_query_param in (
+            request.query_params
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class UserPagination(RecipePagination):
+    cursor_pagination_class = UserCursorPagination
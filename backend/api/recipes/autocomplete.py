@@ -0,0 +1,47 @@
+from bisect import bisect_left
+
+from recipes.cache import get_version
+from recipes.constants import INGREDIENTS_VERSION
+from recipes.models import Ingredient
+
+
+def normalize(value):
+    return value.casefold().replace('ё', 'е')
+
+
+class IngredientIndex:
+    def __init__(self, ingredients):
+        self.items = sorted(
+            (normalize(name), measurement_unit, ingredient_id, name)
+            for ingredient_id, name, measurement_unit in ingredients
+        )
+        self.keys = [item[0] for item in self.items]
+
+    def search(self, prefix, limit=None):
+        prefix = normalize(prefix)
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + chr(0x10ffff), lo=start)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [
+            {
+                'id': ingredient_id,
+                'name': name,
+                'measurement_unit': measurement_unit
+            }
+            for _, measurement_unit, ingredient_id, name
+            in self.items[start:end]
+        ]
+
+
+_ingredient_index = (None, None)
+
+
+def get_ingredient_index():
+    global _ingredient_index
+    version = get_version(INGREDIENTS_VERSION)
+    if _ingredient_index[0] != version:
+        _ingredient_index = (version, IngredientIndex(
+            Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+        ))
+    return _ingredient_index[1]
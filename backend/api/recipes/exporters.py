@@ -0,0 +1,120 @@
+import csv
+import json
+from io import BytesIO
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from rest_framework.negotiation import DefaultContentNegotiation
+
+PDF_FONT_NAME = 'ShoppingListFont'
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
+PDF_LINE_HEIGHT = 18
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+class BaseExporter:
+    content_type = None
+    extension = None
+
+    def __init__(self, ingredients):
+        self.ingredients = ingredients
+
+    def rows(self):
+        for ingredient in self.ingredients.iterator():
+            yield (
+                ingredient['name'],
+                ingredient['total_amount'],
+                ingredient['measurement_unit'],
+            )
+
+    def render(self):
+        raise NotImplementedError
+
+
+class TextExporter(BaseExporter):
+    content_type = 'text/plain; charset=utf-8'
+    extension = 'txt'
+
+    def render(self):
+        for name, amount, measurement_unit in self.rows():
+            yield f'{name} - {amount} {measurement_unit}\n'.encode()
+
+
+class CSVExporter(BaseExporter):
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def render(self):
+        writer = csv.writer(Echo())
+        yield writer.writerow(
+            ('Ингредиент', 'Количество', 'Единица измерения')
+        ).encode()
+        for row in self.rows():
+            yield writer.writerow(row).encode()
+
+
+class JSONExporter(BaseExporter):
+    content_type = 'application/json'
+    extension = 'json'
+
+    def render(self):
+        separator = '['
+        for name, amount, measurement_unit in self.rows():
+            yield (separator + json.dumps({
+                'name': name,
+                'amount': amount,
+                'measurement_unit': measurement_unit
+            }, ensure_ascii=False)).encode()
+            separator = ','
+        yield ('[]' if separator == '[' else ']').encode()
+
+
+class PDFExporter(BaseExporter):
+    content_type = 'application/pdf'
+    extension = 'pdf'
+
+    def register_font(self):
+        if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(
+                TTFont(PDF_FONT_NAME, settings.SHOPPING_LIST_PDF_FONT)
+            )
+
+    def render(self):
+        self.register_font()
+        buffer = BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        _, height = A4
+        top = height - PDF_MARGIN
+
+        pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+        y = top
+        for name, amount, measurement_unit in self.rows():
+            if y < PDF_MARGIN:
+                pdf.showPage()
+                pdf.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+                y = top
+            pdf.drawString(
+                PDF_MARGIN, y, f'{name} - {amount} {measurement_unit}'
+            )
+            y -= PDF_LINE_HEIGHT
+        pdf.save()
+        yield buffer.getvalue()
+
+
+EXPORTERS = {
+    exporter.extension: exporter
+    for exporter in (TextExporter, CSVExporter, JSONExporter, PDFExporter)
+}
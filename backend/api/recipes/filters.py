@@ -1,6 +1,19 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Ingredient, Recipe
+from recipes.cache import get_version
+from recipes.constants import TAGS_VERSION
+from recipes.models import Ingredient, Recipe, Tag
+
+_tag_ids = (None, {})
+
+
+def get_tag_ids():
+    global _tag_ids
+    version = get_version(TAGS_VERSION)
+    if _tag_ids[0] != version:
+        _tag_ids = (version, dict(Tag.objects.values_list('slug', 'id')))
+    return _tag_ids[1]
 
 
 class IngredientFilter(FilterSet):
@@ -12,18 +25,39 @@ class IngredientFilter(FilterSet):
         ordering = ('name',)
 
 
+class TagsFilter(filters.MultipleChoiceFilter):
+    @property
+    def field(self):
+        self.extra['choices'] = [(slug, slug) for slug in get_tag_ids()]
+        return super().field
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        tag_ids = get_tag_ids()
+        return qs.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'),
+                tag_id__in=[tag_ids.get(slug) for slug in value]
+            )
+        ))
+
+
 class RecipeFilter(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = TagsFilter(field_name='tags__slug')
     is_favorited = filters.BooleanFilter(
         method='get_is_favorited',
     )
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
     )
+    search = filters.CharFilter(method='get_search')
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'is_in_shopping_cart', 'tags', 'author')
+        fields = (
+            'is_favorited', 'is_in_shopping_cart', 'tags', 'author', 'search'
+        )
         ordering = ('-pub_date',)
 
     def get_is_favorited(self, queryset, name, value):
@@ -35,3 +69,6 @@ class RecipeFilter(FilterSet):
         if value and self.request.user.is_authenticated:
             return queryset.filter(shopping_list__user=self.request.user)
         return queryset
+
+    def get_search(self, queryset, name, value):
+        return queryset.search(value)
@@ -1,7 +1,126 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
+
+from recipes.cache import get_user_version_name, get_version
+from recipes.constants import (
+    BULK_ABSENT,
+    BULK_CREATED,
+    BULK_DELETED,
+    BULK_EXISTS,
+    BULK_NOT_FOUND
+)
+
+from .serializers import BulkIdsSerializer
 
 
 class ListRetrieveGenericMixin(mixins.ListModelMixin,
                                mixins.RetrieveModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class ConditionalGetMixin:
+    version_names = ()
+    user_versioned = False
+
+    def get_versions(self, request):
+        names = list(self.version_names)
+        if self.user_versioned and request.user.is_authenticated:
+            names.append(get_user_version_name(request.user.id))
+        return [get_version(name) for name in names]
+
+    def get_etag(self, request, versions):
+        parts = [
+            *versions,
+            request.accepted_renderer.format,
+            request.get_full_path(),
+        ]
+        if self.user_versioned:
+            parts.append(request.user.pk)
+        return quote_etag(
+            hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = self.get_versions(request)
+        etag = self.get_etag(request, versions)
+        last_modified = max(versions) // 10 ** 9
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            if self.user_versioned:
+                patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class BulkRelationMixin:
+    def get_bulk_targets(self, request, queryset):
+        serializer = BulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        targets = set(
+            queryset.filter(id__in=ids).values_list('id', flat=True)
+        )
+        return ids, targets
+
+    def bulk_add(self, request, queryset, relation_model, field):
+        ids, targets = self.get_bulk_targets(request, queryset)
+        created = {
+            getattr(relation, f'{field}_id')
+            for relation in relation_model.objects.bulk_create_or_ignore([
+                relation_model(user=request.user, **{f'{field}_id': target_id})
+                for target_id in ids
+                if target_id in targets
+            ])
+        }
+        return [
+            {
+                'id': target_id,
+                'status': (
+                    BULK_NOT_FOUND if target_id not in targets
+                    else BULK_CREATED if target_id in created
+                    else BULK_EXISTS
+                )
+            }
+            for target_id in ids
+        ]
+
+    def bulk_delete(self, request, queryset, relation_model, field):
+        ids, targets = self.get_bulk_targets(request, queryset)
+        deleted = {
+            getattr(relation, f'{field}_id')
+            for relation in relation_model.objects.filter(
+                user=request.user, **{f'{field}_id__in': targets}
+            ).delete_returning()
+        }
+        return [
+            {
+                'id': target_id,
+                'status': (
+                    BULK_NOT_FOUND if target_id not in targets
+                    else BULK_DELETED if target_id in deleted
+                    else BULK_ABSENT
+                )
+            }
+            for target_id in ids
+        ]
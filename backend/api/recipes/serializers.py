@@ -1,16 +1,33 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db import transaction
 from drf_extra_fields.fields import Base64ImageField
-from rest_framework import serializers, status, validators
-from rest_framework.validators import UniqueTogetherValidator
-
+from rest_framework import serializers, status
+from rest_framework.settings import api_settings
+
+from api.fields import (
+    ImageVariantsField,
+    PrimaryKeyField,
+    StreamingBase64ImageField,
+    VariantImageField,
+    build_absolute_url
+)
 from api.users.serializers import UserSerializer
-from recipes.constants import INGREDIENT_AMOUNT_VALIDATION_MESSAGE
+from recipes.cache import get_recipe_cache_key, get_version
+from recipes.constants import (
+    BULK_MAX_SIZE,
+    INGREDIENT_AMOUNT_VALIDATION_MESSAGE,
+    INGREDIENTS_VERSION,
+    RECIPE_IMAGE_VARIANTS,
+    TAGS_VERSION
+)
 from recipes.models import (
     Favorite,
     Ingredient,
     IngredientInRecipe,
     Recipe,
+    ShoppingCartIngredient,
     ShoppingList,
     Tag
 )
@@ -57,9 +74,7 @@ class IngredientInRecipeSerializer(serializers.ModelSerializer):
 
 
 class IngredientInRecipeAddSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all()
-    )
+    id = PrimaryKeyField(queryset=Ingredient.objects.all())
 
     class Meta:
         model = IngredientInRecipe
@@ -70,7 +85,7 @@ class IngredientInRecipeAddSerializer(serializers.ModelSerializer):
 
 
 class RecipeCardSerializer(serializers.ModelSerializer):
-    image = Base64ImageField()
+    image = VariantImageField(variant='card')
 
     class Meta:
         model = Recipe
@@ -82,20 +97,48 @@ class RecipeCardSerializer(serializers.ModelSerializer):
         )
 
 
-class RecipeListSerializer(serializers.ModelSerializer):
+class AuthorSerializer(UserSerializer):
+    def to_representation(self, instance):
+        authors = self.context.setdefault('authors', {})
+        if instance.id not in authors:
+            authors[instance.id] = super().to_representation(instance)
+        return authors[instance.id]
+
+
+class RecipeFragmentSerializer(serializers.ModelSerializer):
     image = Base64ImageField(max_length=None)
-    author = UserSerializer(read_only=True, many=False)
+    image_variants = ImageVariantsField(
+        variants=RECIPE_IMAGE_VARIANTS,
+        source='image'
+    )
+    author = AuthorSerializer(read_only=True, many=False)
     tags = TagSerializer(read_only=True, many=True)
     ingredients = IngredientInRecipeSerializer(
         many=True,
         allow_empty=False,
         source='ingredient_in_recipe'
     )
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
+        fields = (
+            'id',
+            'tags',
+            'author',
+            'ingredients',
+            'name',
+            'image',
+            'image_variants',
+            'text',
+            'cooking_time'
+        )
+
+
+class RecipeListSerializer(RecipeFragmentSerializer):
+    is_favorited = serializers.SerializerMethodField()
+    is_in_shopping_cart = serializers.SerializerMethodField()
+
+    class Meta(RecipeFragmentSerializer.Meta):
         fields = (
             'id',
             'tags',
@@ -105,31 +148,90 @@ class RecipeListSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_variants',
             'text',
             'cooking_time'
         )
 
-    def get_is_favorited(self, recipe):
+    def _get_fragment_versions(self):
+        if 'fragment_versions' not in self.context:
+            self.context['fragment_versions'] = (
+                get_version(TAGS_VERSION), get_version(INGREDIENTS_VERSION)
+            )
+        return self.context['fragment_versions']
+
+    def _get_fragment(self, recipe):
+        key = get_recipe_cache_key(recipe, *self._get_fragment_versions())
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = RecipeFragmentSerializer(
+                recipe,
+                context={
+                    'authors': self.context.setdefault('fragment_authors', {})
+                }
+            ).data
+            cache.set(key, fragment, settings.RECIPE_CACHE_TIMEOUT)
+        return fragment
+
+    def _build_url(self, url):
+        return build_absolute_url(self.context.get('request'), url)
+
+    def _get_author(self, recipe, fragment):
+        authors = self.context.setdefault('authors', {})
+        if recipe.author_id not in authors:
+            authors[recipe.author_id] = dict(
+                fragment['author'],
+                is_subscribed=self.fields['author'].get_is_subscribed(
+                    recipe.author
+                ),
+                avatar=self._build_url(fragment['author']['avatar'])
+            )
+        return authors[recipe.author_id]
+
+    def to_representation(self, recipe):
+        fragment = self._get_fragment(recipe)
+        image_variants = {
+            variant: self._build_url(url)
+            for variant, url in fragment['image_variants'].items()
+        }
+        image = self._build_url(fragment['image'])
+        if isinstance(self.parent, serializers.ListSerializer):
+            image = image_variants.get('card', image)
+        data = dict(
+            fragment,
+            author=self._get_author(recipe, fragment),
+            image=image,
+            image_variants=image_variants,
+            is_favorited=self.get_is_favorited(recipe),
+            is_in_shopping_cart=self.get_is_in_shopping_cart(recipe)
+        )
+        return {field: data[field] for field in self.Meta.fields}
+
+    def _get_user_flag(self, recipe, flag, related_name):
+        if hasattr(recipe, flag):
+            return getattr(recipe, flag)
         request = self.context.get('request')
-        return (
+        return bool(
             request
             and request.user.is_authenticated
-            and recipe.favorites.filter(user=request.user).exists()
+            and getattr(recipe, related_name).filter(
+                user=request.user
+            ).exists()
         )
 
+    def get_is_favorited(self, recipe):
+        return self._get_user_flag(recipe, 'is_favorited', 'favorites')
+
     def get_is_in_shopping_cart(self, recipe):
-        request = self.context.get('request')
-        return (
-            request
-            and request.user.is_authenticated
-            and recipe.shopping_list.filter(user=request.user).exists()
+        return self._get_user_flag(
+            recipe, 'is_in_shopping_cart', 'shopping_list'
         )
 
 
 class RecipeCreateSerializer(serializers.ModelSerializer):
     ingredients = IngredientInRecipeAddSerializer(many=True)
-    image = Base64ImageField()
-    tags = serializers.PrimaryKeyRelatedField(
+    image = StreamingBase64ImageField()
+    tags = PrimaryKeyField(
         queryset=Tag.objects.all(),
         many=True
     )
@@ -165,15 +267,65 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         validated_data['author'] = self.context.get('request').user
         obj = Recipe.objects.create(**validated_data)
         self._create_ingredients(obj, ingredients)
-        obj.tags.set(tags)
+        obj.tags.add(*tags)
         return obj
 
+    def _update_ingredients(self, instance, ingredients):
+        current = {
+            item.ingredient_id: item
+            for item in instance.ingredient_in_recipe.all()
+        }
+        amounts = {
+            ingredient['id'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+        deltas = {}
+        created = []
+        for ingredient_id, amount in amounts.items():
+            if ingredient_id not in current:
+                deltas[ingredient_id] = amount
+                created.append(IngredientInRecipe(
+                    recipe=instance, ingredient_id=ingredient_id, amount=amount
+                ))
+        updated = []
+        for ingredient_id, item in current.items():
+            amount = amounts.get(ingredient_id)
+            if amount is not None and item.amount != amount:
+                deltas[ingredient_id] = amount - item.amount
+                item.amount = amount
+                updated.append(item)
+
+        IngredientInRecipe.objects.bulk_create(created)
+        IngredientInRecipe.objects.bulk_update(updated, ('amount',))
+        deleted = IngredientInRecipe.objects.filter(id__in=[
+            item.id for ingredient_id, item in current.items()
+            if ingredient_id not in amounts
+        ]).delete_returning()
+        return deltas, len(created) + len(updated) + len(deleted)
+
+    def _update_tags(self, instance, tags):
+        current = set(instance.tags.values_list('id', flat=True))
+        submitted = {tag.id for tag in tags}
+        added, removed = submitted - current, current - submitted
+        if added:
+            instance.tags.add(*added)
+        if removed:
+            instance.tags.remove(*removed)
+        return len(added) + len(removed)
+
     @transaction.atomic
     def update(self, instance, validated_data):
-        instance.tags.clear()
-        instance.tags.set(validated_data.pop('tags'))
-        instance.ingredients.clear()
-        self._create_ingredients(instance, validated_data.pop('ingredients'))
+        deltas, ingredient_rows = self._update_ingredients(
+            instance, validated_data.pop('ingredients')
+        )
+        self.rows_touched = ingredient_rows + self._update_tags(
+            instance, validated_data.pop('tags')
+        )
+
+        if deltas:
+            ShoppingCartIngredient.objects.change_recipe_totals(
+                instance.id, deltas
+            )
         return super().update(instance, validated_data)
 
     def validate_image(self, value):
@@ -211,20 +363,47 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 detail=INGREDIENT_AMOUNT_VALIDATION_MESSAGE,
             )
 
+        errors = {}
+        ingredients = self._in_bulk(
+            Ingredient,
+            [ingredient['id'] for ingredient in attrs['ingredients']],
+            'ingredients',
+            'Ингредиенты не найдены',
+            errors
+        )
+        tags = self._in_bulk(
+            Tag, attrs['tags'], 'tags', 'Теги не найдены', errors
+        )
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        for ingredient in attrs['ingredients']:
+            ingredient['id'] = ingredients[ingredient['id']]
+        attrs['tags'] = [tags[tag_id] for tag_id in attrs['tags']]
         return attrs
 
+    @staticmethod
+    def _in_bulk(model, ids, field, message, errors):
+        objects = model.objects.in_bulk(ids)
+        missing = sorted(set(ids) - objects.keys())
+        if missing:
+            errors[field] = [f'{message}: {", ".join(map(str, missing))}']
+        return objects
+
     def to_representation(self, instance):
+        request = self.context.get('request')
         return RecipeListSerializer(
-            instance,
+            Recipe.objects.with_user_flags(request.user).for_read().get(
+                id=instance.id
+            ),
             context={
-                'request': self.context.get('request')
+                'request': request
             }
         ).data
 
 
 class SubscriptionSerializer(UserSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
 
     class Meta(UserSerializer.Meta):
         model = User
@@ -235,36 +414,52 @@ class SubscriptionSerializer(UserSerializer):
             'username',
             'first_name',
             'last_name',
-            'avatar'
+            'avatar',
+            'recipes_count'
         )
 
-    def get_recipes(self, obj):
-        request = self.context.get('request')
+    @staticmethod
+    def get_recipes_limit(request):
         recipes_limit = request.query_params.get('recipes_limit')
-
-        queryset = obj.recipes.all()
         if recipes_limit and recipes_limit.strip().isdigit():
-            queryset = queryset[:int(recipes_limit)]
+            return int(recipes_limit)
+        return None
 
-        return RecipeCardSerializer(queryset, many=True).data
+    def get_recipes(self, obj):
+        author_recipes = self.context.get('author_recipes')
+        if author_recipes is not None:
+            recipes = author_recipes[obj.id]
+        else:
+            recipes = obj.recipes.all()
+            recipes_limit = self.get_recipes_limit(self.context['request'])
+            if recipes_limit is not None:
+                recipes = recipes[:recipes_limit]
+
+        return RecipeCardSerializer(recipes, many=True).data
+
+
+class CreateOrIgnoreSerializer(serializers.ModelSerializer):
+    duplicate_message = None
+
+    def create(self, validated_data):
+        instance = self.Meta.model.objects.create_or_ignore(**validated_data)
+        if instance is None:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [self.duplicate_message]
+            })
+        return instance
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
 
+class SubscriptionCreateSerializer(CreateOrIgnoreSerializer):
+    duplicate_message = 'Вы уже подписаны на этого пользователя.'
 
-class SubscriptionCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subscription
         fields = (
             'user',
             'author'
         )
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Subscription.objects.all(),
-                fields=['user', 'author'],
-                message='Вы уже подписаны на этого пользователя.'
-            )]
+        validators = []
 
     def validate(self, attrs):
         user = attrs.get('user')
@@ -287,16 +482,13 @@ class SubscriptionCreateSerializer(serializers.ModelSerializer):
         ).data
 
 
-class ShoppingListSerializer(serializers.ModelSerializer):
+class ShoppingListSerializer(CreateOrIgnoreSerializer):
+    duplicate_message = 'Рецепт уже в списке покупок.'
+
     class Meta:
         model = ShoppingList
         fields = ('user', 'recipe')
-        validators = [
-            validators.UniqueTogetherValidator(
-                queryset=ShoppingList.objects.all(),
-                fields=['user', 'recipe'],
-            )
-        ]
+        validators = []
 
     def to_representation(self, instance):
         return RecipeCardSerializer(
@@ -307,16 +499,13 @@ class ShoppingListSerializer(serializers.ModelSerializer):
         ).data
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(CreateOrIgnoreSerializer):
+    duplicate_message = 'Рецепт уже в избранном.'
+
     class Meta:
         model = Favorite
         fields = ('user', 'recipe')
-        validators = [
-            validators.UniqueTogetherValidator(
-                queryset=Favorite.objects.all(),
-                fields=['user', 'recipe'],
-            )
-        ]
+        validators = []
 
     def to_representation(self, instance):
         return RecipeCardSerializer(
@@ -325,3 +514,11 @@ class FavoriteSerializer(serializers.ModelSerializer):
                 'request': self.context.get('request')
             }
         ).data
+
+
+class BulkIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_MAX_SIZE
+    )
@@ -1,24 +1,38 @@
 from django.conf import settings
-from django.db.models import Sum
-from django.http import FileResponse
+from django.core.cache import cache
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, serializers, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from api.pagination import RecipePagination
+from api.pagination import RecipeCursorPagination, RecipePagination
+from recipes.cache import get_shopping_list_cache_key
+from recipes.constants import (
+    INGREDIENTS_VERSION,
+    RECIPES_VERSION,
+    ROWS_TOUCHED_HEADER,
+    TAGS_VERSION
+)
 from recipes.models import (
     Favorite,
     Ingredient,
-    IngredientInRecipe,
     Recipe,
+    ShoppingCartIngredient,
     ShoppingList,
     Tag
 )
 
+from .autocomplete import get_ingredient_index
+from .exporters import EXPORTERS, ExportContentNegotiation, TextExporter
 from .filters import IngredientFilter, RecipeFilter
-from .mixins import ListRetrieveGenericMixin
+from .mixins import (
+    BulkRelationMixin,
+    ConditionalGetMixin,
+    ListRetrieveGenericMixin
+)
 from .permissions import IsAuthorOrReadOnly
 from .serializers import (
     FavoriteSerializer,
@@ -30,21 +44,42 @@ from .serializers import (
 )
 
 
-class IngredientViewSet(ListRetrieveGenericMixin):
+class IngredientViewSet(ConditionalGetMixin, ListRetrieveGenericMixin):
+    version_names = (INGREDIENTS_VERSION,)
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filterset_class = IngredientFilter
     filter_backends = (DjangoFilterBackend, filters.SearchFilter,)
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
 
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get('name'):
+            return super().list(request, *args, **kwargs)
+        return self.conditional_response(self.autocomplete, request)
+
+    def autocomplete(self, request):
+        limit = request.query_params.get('limit')
+        if limit and limit.strip().isdigit():
+            limit = int(limit)
+        else:
+            limit = None
+        return Response(get_ingredient_index().search(
+            request.query_params.get('name'), limit
+        ))
 
-class TagsViewSet(ListRetrieveGenericMixin):
+
+class TagsViewSet(ConditionalGetMixin, ListRetrieveGenericMixin):
+    version_names = (TAGS_VERSION,)
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalGetMixin,
+                    BulkRelationMixin,
+                    viewsets.ModelViewSet):
+    version_names = (RECIPES_VERSION, TAGS_VERSION, INGREDIENTS_VERSION)
+    user_versioned = True
     queryset = Recipe.objects.all()
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,
                           IsAuthorOrReadOnly,)
@@ -52,17 +87,44 @@ class RecipeViewSet(viewsets.ModelViewSet):
     filterset_class = RecipeFilter
     filter_backends = (DjangoFilterBackend,)
 
+    def get_queryset(self):
+        queryset = Recipe.objects.with_user_flags(self.request.user)
+        if self.request.method == 'GET':
+            return queryset.for_read()
+        return queryset
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return RecipeListSerializer
         return RecipeCreateSerializer
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.rows_touched = serializer.rows_touched
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        response[ROWS_TOUCHED_HEADER] = self.rows_touched
+        return response
+
     @action(detail=True, methods=['get'], url_path='get-link')
     def get_link(self, request, **kwargs):
         recipe = self.get_object()
         short_url = request.build_absolute_uri(f'/s/{recipe.short_link}/')
         return Response({'short-link': short_url}, status=status.HTTP_200_OK)
 
+    @action(detail=False,
+            methods=('GET',),
+            permission_classes=(permissions.IsAuthenticated,),
+            pagination_class=RecipeCursorPagination)
+    def feed(self, request):
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset()).feed(request.user)
+        )
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @transaction.atomic
     def __add_recipe(self, request, pk, serializer_class):
         serializer = serializer_class(
             data={'recipe': get_object_or_404(Recipe, id=pk).id,
@@ -91,18 +153,18 @@ class RecipeViewSet(viewsets.ModelViewSet):
                                  kwargs.get('pk'),
                                  FavoriteSerializer)
 
+    @transaction.atomic
     def __delete_recipe(self, request, pk, model, error_detail):
-        deleted_count, _ = model.objects.filter(
+        deleted = model.objects.filter(
             user=request.user,
             recipe=get_object_or_404(Recipe, id=pk)
-        ).delete()
+        ).delete_returning()
 
-        if deleted_count == 0:
+        if not deleted:
             raise serializers.ValidationError(
                 detail=error_detail,
                 code=status.HTTP_400_BAD_REQUEST,
             )
-
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @shopping_cart.mapping.delete
@@ -112,6 +174,42 @@ class RecipeViewSet(viewsets.ModelViewSet):
             ShoppingList,
             'Рецепт не в списке покупок, нельзя удалить')
 
+    @transaction.atomic
+    def __bulk_add_recipes(self, request, model):
+        outcomes = self.bulk_add(
+            request, Recipe.objects.all(), model, 'recipe'
+        )
+        return Response(outcomes, status=status.HTTP_200_OK)
+
+    @transaction.atomic
+    def __bulk_delete_recipes(self, request, model):
+        outcomes = self.bulk_delete(
+            request, Recipe.objects.all(), model, 'recipe'
+        )
+        return Response(outcomes, status=status.HTTP_200_OK)
+
+    @action(detail=False,
+            methods=('POST',),
+            url_path='shopping_cart',
+            permission_classes=(permissions.IsAuthenticated,))
+    def shopping_cart_bulk(self, request):
+        return self.__bulk_add_recipes(request, ShoppingList)
+
+    @shopping_cart_bulk.mapping.delete
+    def delete_shopping_cart_bulk(self, request):
+        return self.__bulk_delete_recipes(request, ShoppingList)
+
+    @action(detail=False,
+            methods=('POST',),
+            url_path='favorite',
+            permission_classes=(permissions.IsAuthenticated,))
+    def favorite_bulk(self, request):
+        return self.__bulk_add_recipes(request, Favorite)
+
+    @favorite_bulk.mapping.delete
+    def delete_favorite_bulk(self, request):
+        return self.__bulk_delete_recipes(request, Favorite)
+
     @favorite.mapping.delete
     def delete_favorite(self, request, **kwargs):
         return self.__delete_recipe(
@@ -119,46 +217,48 @@ class RecipeViewSet(viewsets.ModelViewSet):
             Favorite,
             'Рецепт не в избранном, нельзя удалить')
 
-    def _data_preprocessing(self, ingredients):
-        result = ''
-        total_amount = 0
-        m_unit = None
-
-        prev_item = None
-        for ingredient in ingredients:
-            name = ingredient.get('ingredient__name')
-            measurement_unit = ingredient.get('ingredient__measurement_unit')
-            curr_amount = ingredient.get('total_amount')
-
-            if prev_item and prev_item != name:
-                result += f'{prev_item} - {total_amount} {measurement_unit}\n'
-
-            prev_item = name
-            m_unit = measurement_unit
-            total_amount += curr_amount
-
-        if prev_item:
-            result += f'{prev_item} - {total_amount} {m_unit}\n'
-
-        return result
+    def _cache_chunks(self, key, chunks):
+        content = []
+        for chunk in chunks:
+            content.append(chunk)
+            yield chunk
+        cache.set(
+            key, b''.join(content), settings.SHOPPING_LIST_CACHE_TIMEOUT
+        )
 
     @action(detail=False,
-            methods=('GET',))
+            methods=('GET',),
+            permission_classes=(permissions.IsAuthenticated,),
+            content_negotiation_class=ExportContentNegotiation)
     def download_shopping_cart(self, request):
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__shopping_list__user=request.user
-        ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit',
-        ).annotate(
-            total_amount=Sum('amount')
-        ).order_by('ingredient__name')
-
-        filename = settings.SHOPPING_LIST_FILENAME
-        with open(filename, mode='w', encoding='UTF-8') as file:
-            file.write(self._data_preprocessing(ingredients))
-
-        headers = {
-            'Content-Description': f'attachment: filename={filename}'
-        }
-        return FileResponse(open(filename, 'rb'), headers=headers)
+        extension = request.query_params.get(
+            'format', TextExporter.extension
+        )
+        exporter_class = EXPORTERS.get(extension)
+        if exporter_class is None:
+            raise serializers.ValidationError(
+                detail=f'Неподдерживаемый формат. Доступные форматы: '
+                       f'{", ".join(EXPORTERS)}',
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = get_shopping_list_cache_key(request.user.id, extension)
+        content = cache.get(key)
+        if content is not None:
+            chunks = (content,)
+        else:
+            ingredients = ShoppingCartIngredient.objects.filter(
+                user=request.user
+            ).normalized_totals()
+            chunks = self._cache_chunks(
+                key, exporter_class(ingredients).render()
+            )
+
+        filename = f'{settings.SHOPPING_LIST_FILENAME}.{extension}'
+        return StreamingHttpResponse(
+            chunks,
+            content_type=exporter_class.content_type,
+            headers={
+                'Content-Disposition': f'attachment; filename="{filename}"'
+            }
+        )
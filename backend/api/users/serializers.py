@@ -1,12 +1,12 @@
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from api.fields import StreamingBase64ImageField, VariantImageField
 from users.models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
-    avatar = Base64ImageField()
+    avatar = VariantImageField(variant='avatar')
 
     class Meta:
         model = User
@@ -25,17 +25,44 @@ class UserSerializer(serializers.ModelSerializer):
             }
         }
 
+    def _get_page_author_ids(self, obj):
+        root = self.root
+        if (
+            isinstance(root, serializers.ListSerializer)
+            and root.instance is not None
+        ):
+            return {
+                getattr(item, 'author_id', item.pk) for item in root.instance
+            } | {obj.id}
+        return {obj.id}
+
+    def _get_subscribed_ids(self, request, obj):
+        if not hasattr(request, '_subscribed_author_ids'):
+            request._subscribed_author_ids = set()
+            request._checked_author_ids = set()
+        if obj.id not in request._checked_author_ids:
+            author_ids = (
+                self._get_page_author_ids(obj) - request._checked_author_ids
+            )
+            request._subscribed_author_ids.update(
+                request.user.follower.filter(
+                    author_id__in=author_ids
+                ).values_list('author_id', flat=True)
+            )
+            request._checked_author_ids.update(author_ids)
+        return request._subscribed_author_ids
+
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
-        return (
+        return bool(
             request
             and request.user.is_authenticated
-            and request.user.follower.filter(author_id=obj.id).exists()
+            and obj.id in self._get_subscribed_ids(request, obj)
         )
 
 
 class UserAvatarSerializer(serializers.ModelSerializer):
-    avatar = Base64ImageField(allow_null=True)
+    avatar = StreamingBase64ImageField(allow_null=True)
 
     class Meta:
         model = User
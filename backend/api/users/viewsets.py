@@ -1,4 +1,7 @@
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet as DjoserUserViewSet
@@ -6,11 +9,13 @@ from rest_framework import permissions, serializers, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from api.pagination import RecipePagination
+from api.pagination import UserPagination
+from api.recipes.mixins import BulkRelationMixin
 from api.recipes.serializers import (
     SubscriptionCreateSerializer,
     SubscriptionSerializer
 )
+from recipes.models import Recipe
 from users.models import Subscription
 
 from .serializers import UserAvatarSerializer, UserSerializer
@@ -18,12 +23,12 @@ from .serializers import UserAvatarSerializer, UserSerializer
 User = get_user_model()
 
 
-class UserViewSet(DjoserUserViewSet):
+class UserViewSet(BulkRelationMixin, DjoserUserViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
-    pagination_class = RecipePagination
+    pagination_class = UserPagination
 
     def get_permissions(self):
         if self.action == 'me':
@@ -33,6 +38,7 @@ class UserViewSet(DjoserUserViewSet):
     @action(detail=True,
             methods=('POST',),
             permission_classes=(permissions.IsAuthenticated,))
+    @transaction.atomic
     def subscribe(self, request, id=None):
         author = get_object_or_404(User, id=id)
 
@@ -49,13 +55,15 @@ class UserViewSet(DjoserUserViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     @subscribe.mapping.delete
+    @transaction.atomic
     def unsubscribe(self, request, id=None):
-        deleted_count, _ = Subscription.objects.filter(
+        author = get_object_or_404(User, id=id)
+        deleted = Subscription.objects.filter(
             user=request.user,
-            author=get_object_or_404(User, id=id)
-        ).delete()
+            author=author
+        ).delete_returning()
 
-        if deleted_count == 0:
+        if not deleted:
             raise serializers.ValidationError(
                 detail='Подписка не существует',
                 code=status.HTTP_400_BAD_REQUEST,
@@ -63,16 +71,47 @@ class UserViewSet(DjoserUserViewSet):
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False,
+            methods=('POST',),
+            url_path='subscribe',
+            permission_classes=(permissions.IsAuthenticated,))
+    @transaction.atomic
+    def subscribe_bulk(self, request):
+        outcomes = self.bulk_add(
+            request,
+            User.objects.exclude(id=request.user.id),
+            Subscription,
+            'author'
+        )
+        return Response(outcomes, status=status.HTTP_200_OK)
+
+    @subscribe_bulk.mapping.delete
+    @transaction.atomic
+    def unsubscribe_bulk(self, request):
+        outcomes = self.bulk_delete(
+            request, User.objects.all(), Subscription, 'author'
+        )
+        return Response(outcomes, status=status.HTTP_200_OK)
+
     @action(detail=False,
             methods=('GET',),
             permission_classes=(permissions.IsAuthenticated,))
     def subscriptions(self, request):
-        curr_subscriptions = User.objects.filter(following__user=request.user)
+        curr_subscriptions = self.paginate_queryset(
+            User.objects.filter(following__user=request.user)
+        )
+        author_recipes = defaultdict(list)
+        for recipe in Recipe.objects.latest_for_authors(
+            [author.id for author in curr_subscriptions],
+            SubscriptionSerializer.get_recipes_limit(request)
+        ):
+            author_recipes[recipe.author_id].append(recipe)
 
         serializer = SubscriptionSerializer(
-            self.paginate_queryset(curr_subscriptions),
+            curr_subscriptions,
             context={
-                'request': request
+                'request': request,
+                'author_recipes': author_recipes
             },
             many=True,
         )
@@ -75,6 +75,13 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache', cast=str),
+        'LOCATION': config('CACHE_LOCATION', default='', cast=str),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -106,6 +113,8 @@ STATIC_ROOT = BASE_DIR / 'collected_static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+DEFAULT_FILE_STORAGE = 'recipes.storage.ContentAddressedStorage'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -136,6 +145,14 @@ DJOSER = {
     },
 }
 
-SHOPPING_LIST_FILENAME = 'shopping_list.txt'
+SHOPPING_LIST_FILENAME = 'shopping_list'
+
+SHOPPING_LIST_CACHE_TIMEOUT = config('SHOPPING_LIST_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+SHOPPING_LIST_PDF_FONT = config('SHOPPING_LIST_PDF_FONT', default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', cast=str)
+
+RECIPE_CACHE_TIMEOUT = config('RECIPE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+IMAGE_VARIANT_WORKERS = config('IMAGE_VARIANT_WORKERS', default=2, cast=int)
 
 SITE_URL = config('SITE_URL', default='localhost', cast=str)
@@ -1,5 +1,4 @@
 from django.contrib import admin
-from django.db.models import Count
 
 from .models import (
     Favorite,
@@ -35,23 +34,16 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = (
         'author',
         'name',
-        'get_favorites_count'
+        'favorites_count',
+        'shopping_cart_count'
     )
     search_fields = (
         'name', 'author__username', 'tags__name'
     )
-    readonly_fields = ('get_favorites_count',)
+    readonly_fields = ('favorites_count', 'shopping_cart_count')
     inlines = (IngredientInRecipeAdmin,)
     list_filter = ('tags',)
 
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.annotate(favorites_count=Count('favorites'))
-
-    @admin.display(description='Число добавлений в избранное')
-    def get_favorites_count(self, recipe):
-        return recipe.favorites_count
-
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import (
+    CART_VERSION,
+    INGREDIENTS_VERSION,
+    RECIPE_CACHE_KEY,
+    RECIPE_CACHE_VERSION,
+    SHOPPING_LIST_CACHE_KEY,
+    SHORT_LINK_CACHE_KEY,
+    SHORT_LINK_LOCAL_SIZE,
+    SHORT_LINK_LOCAL_TIMEOUT,
+    USER_VERSION,
+    VERSION_CACHE_KEY
+)
+
+_short_links = OrderedDict()
+
+
+def get_recipe_cache_key(recipe, tags_version, ingredients_version):
+    return RECIPE_CACHE_KEY.format(
+        version=RECIPE_CACHE_VERSION,
+        recipe_id=recipe.id,
+        cache_version=recipe.cache_version,
+        tags_version=tags_version,
+        ingredients_version=ingredients_version
+    )
+
+
+def get_short_link_cache_key(short_link):
+    return SHORT_LINK_CACHE_KEY.format(short_link=short_link)
+
+
+def get_user_version_name(user_id):
+    return USER_VERSION.format(user_id=user_id)
+
+
+def get_cart_version_name(user_id):
+    return CART_VERSION.format(user_id=user_id)
+
+
+def get_version(name):
+    return cache.get_or_set(
+        VERSION_CACHE_KEY.format(name=name),
+        time.time_ns,
+        None
+    )
+
+
+def bump_versions(*names):
+    keys = [VERSION_CACHE_KEY.format(name=name) for name in names]
+    transaction.on_commit(
+        lambda: cache.set_many(dict.fromkeys(keys, time.time_ns()), None)
+    )
+
+
+def get_local_short_link(short_link):
+    entry = _short_links.get(short_link)
+    if entry is None or entry[1] <= time.monotonic():
+        return None
+    _short_links.move_to_end(short_link)
+    return entry[0]
+
+
+def set_local_short_link(short_link, recipe_id):
+    _short_links[short_link] = (
+        recipe_id, time.monotonic() + SHORT_LINK_LOCAL_TIMEOUT
+    )
+    _short_links.move_to_end(short_link)
+    if len(_short_links) > SHORT_LINK_LOCAL_SIZE:
+        _short_links.popitem(last=False)
+
+
+def invalidate_short_link(short_link):
+    key = get_short_link_cache_key(short_link)
+
+    def invalidate():
+        _short_links.pop(short_link, None)
+        cache.delete(key)
+
+    transaction.on_commit(invalidate)
+
+
+def get_shopping_list_cache_key(user_id, extension):
+    return SHOPPING_LIST_CACHE_KEY.format(
+        user_id=user_id,
+        cart_version=get_version(get_cart_version_name(user_id)),
+        ingredients_version=get_version(INGREDIENTS_VERSION),
+        extension=extension
+    )
@@ -6,6 +6,30 @@ TAG_SLUG_MAX_LENGTH = 32
 
 SHORT_LINK_MAX_LENGTH = 10
 
+UNIT_CONVERSIONS = {
+    'г': ('г', 1),
+    'кг': ('г', 1000),
+    'мл': ('мл', 1),
+    'л': ('мл', 1000),
+    'шт': ('шт.', 1),
+    'шт.': ('шт.', 1),
+}
+
+SEARCH_CONFIG = 'russian'
+SEARCH_FIELDS = frozenset(('name', 'text'))
+
+FANOUT_MAX_FOLLOWERS = 10000
+TIMELINE_BACKFILL_SIZE = 50
+
+ROWS_TOUCHED_HEADER = 'X-Rows-Touched'
+
+BULK_MAX_SIZE = 500
+BULK_CREATED = 'created'
+BULK_DELETED = 'deleted'
+BULK_EXISTS = 'exists'
+BULK_ABSENT = 'absent'
+BULK_NOT_FOUND = 'not_found'
+
 MIN_COOKING_TIME = 1
 MIN_INGREDIENT_AMOUNT = 1
 MAX_COOKING_TIME = 3600
@@ -19,3 +43,51 @@ INGREDIENT_AMOUNT_VALIDATION_MESSAGE = (
     f'Количество ингредиента не может быть меньше {MIN_INGREDIENT_AMOUNT} '
     f'или больше {MAX_INGREDIENT_AMOUNT}'
 )
+
+RECIPE_CACHE_VERSION = 3
+RECIPE_CACHE_KEY = (
+    'recipe:v{version}:{recipe_id}:{cache_version}:'
+    '{tags_version}:{ingredients_version}'
+)
+
+SHORT_LINK_CACHE_KEY = 'short_link:{short_link}'
+SHORT_LINK_MISSING = 0
+SHORT_LINK_TIMEOUT = 60 * 60 * 24
+SHORT_LINK_NEGATIVE_TIMEOUT = 60
+SHORT_LINK_LOCAL_TIMEOUT = 60
+SHORT_LINK_LOCAL_SIZE = 1024
+
+VERSION_CACHE_KEY = 'version:{name}'
+RECIPES_VERSION = 'recipes'
+TAGS_VERSION = 'tags'
+INGREDIENTS_VERSION = 'ingredients'
+USER_VERSION = 'user:{user_id}'
+CART_VERSION = 'cart:{user_id}'
+SHOPPING_LIST_CACHE_KEY = (
+    'shopping_list:{user_id}:{cart_version}:{ingredients_version}:'
+    '{extension}'
+)
+
+IMAGE_MAX_SIZE = 5 * 1024 * 1024
+IMAGE_MAX_DIMENSION = 4096
+IMAGE_DECODE_CHUNK_SIZE = 64 * 1024
+IMAGE_SIZE_VALIDATION_MESSAGE = (
+    f'Размер изображения не должен превышать {IMAGE_MAX_SIZE} байт.'
+)
+IMAGE_DIMENSION_VALIDATION_MESSAGE = (
+    f'Стороны изображения не должны превышать {IMAGE_MAX_DIMENSION} px.'
+)
+IMAGE_INVALID_MESSAGE = 'Загрузите корректное изображение.'
+
+CONTENT_HASH_NAME = '{digest}{extension}'
+
+IMAGE_VARIANT_NAME = '{root}.{variant}.webp'
+IMAGE_VARIANT_FORMAT = 'WEBP'
+IMAGE_VARIANT_QUALITY = 80
+RECIPE_IMAGE_VARIANTS = {
+    'card': (480, 480, True),
+    'detail': (1280, 1280, False),
+}
+AVATAR_IMAGE_VARIANTS = {
+    'avatar': (160, 160, True),
+}
@@ -0,0 +1,95 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .constants import (
+    IMAGE_VARIANT_FORMAT,
+    IMAGE_VARIANT_NAME,
+    IMAGE_VARIANT_QUALITY
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            thread_name_prefix='image-variants'
+        )
+    return _executor
+
+
+def get_variant_name(name, variant):
+    return IMAGE_VARIANT_NAME.format(
+        root=os.path.splitext(name)[0],
+        variant=variant
+    )
+
+
+def get_variant_url(field_file, variant):
+    name = get_variant_name(field_file.name, variant)
+    if field_file.storage.exists(name):
+        return field_file.storage.url(name)
+    return field_file.url
+
+
+def render_variant(image, width, height, crop):
+    if crop:
+        variant = ImageOps.fit(image, (width, height), Image.LANCZOS)
+    else:
+        variant = image.copy()
+        variant.thumbnail((width, height), Image.LANCZOS)
+    buffer = BytesIO()
+    variant.save(
+        buffer, IMAGE_VARIANT_FORMAT, quality=IMAGE_VARIANT_QUALITY
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def build_variants(storage, name, variants, callback=None):
+    missing = {
+        variant: size for variant, size in variants.items()
+        if not storage.exists(get_variant_name(name, variant))
+    }
+    if not missing:
+        return
+    with storage.open(name) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    for variant, (width, height, crop) in missing.items():
+        storage.save_derived(
+            get_variant_name(name, variant),
+            render_variant(image, width, height, crop)
+        )
+    if callback is not None:
+        callback()
+
+
+def _build_variants(storage, name, variants, callback):
+    try:
+        build_variants(storage, name, variants, callback)
+    except Exception:
+        logger.exception('Не удалось построить варианты изображения %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(field_file, variants, callback=None):
+    if not field_file:
+        return
+    storage, name = field_file.storage, field_file.name
+    transaction.on_commit(
+        lambda: get_executor().submit(
+            _build_variants, storage, name, variants, callback
+        )
+    )
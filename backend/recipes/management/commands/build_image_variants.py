@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from recipes.constants import AVATAR_IMAGE_VARIANTS, RECIPE_IMAGE_VARIANTS
+from recipes.images import build_variants
+from recipes.models import Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Построение уменьшенных копий изображений рецептов и аватаров'
+
+    def build(self, queryset, field, variants):
+        built = 0
+        for instance in queryset.exclude(**{field: ''}).exclude(
+            **{f'{field}__isnull': True}
+        ).iterator():
+            field_file = getattr(instance, field)
+            build_variants(field_file.storage, field_file.name, variants)
+            built += 1
+        return built
+
+    def handle(self, *args, **kwargs):
+        recipes_built = self.build(
+            Recipe.objects.all(), 'image', RECIPE_IMAGE_VARIANTS
+        )
+        users_built = self.build(
+            User.objects.all(), 'avatar', AVATAR_IMAGE_VARIANTS
+        )
+        Recipe.objects.touch()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Изображения обработаны: рецептов - {recipes_built}, '
+                f'аватаров - {users_built}'
+            )
+        )
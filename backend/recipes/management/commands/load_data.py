@@ -4,6 +4,8 @@ import os
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from recipes.cache import bump_versions
+from recipes.constants import INGREDIENTS_VERSION
 from recipes.models import Ingredient
 
 
@@ -30,6 +32,7 @@ class Command(BaseCommand):
             ],
                 ignore_conflicts=True
             )
+        bump_versions(INGREDIENTS_VERSION)
 
     def handle(self, *args, **kwargs):
         try:
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favorite, Recipe, ShoppingList
+from users.models import Subscription, User
+
+
+def count_subquery(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(total=Count('pk')).values('total')
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчет счетчиков избранного, списка покупок, рецептов '
+        'и подписчиков'
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        recipes_updated = Recipe.objects.update(
+            favorites_count=count_subquery(Favorite, 'recipe'),
+            shopping_cart_count=count_subquery(ShoppingList, 'recipe'),
+        )
+        users_updated = User.objects.update(
+            recipes_count=count_subquery(Recipe, 'author'),
+            followers_count=count_subquery(Subscription, 'author')
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Счетчики пересчитаны: рецептов - {recipes_updated}, '
+                f'пользователей - {users_updated}'
+            )
+        )
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+
+from recipes.cache import bump_versions, get_cart_version_name
+from recipes.models import IngredientInRecipe, ShoppingCartIngredient
+
+
+class Command(BaseCommand):
+    help = 'Сверка и пересборка агрегатов списков покупок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Пересобрать агрегаты для расходящихся пользователей'
+        )
+
+    def get_live_totals(self):
+        totals = IngredientInRecipe.objects.filter(
+            recipe__shopping_list__isnull=False
+        ).values(
+            'recipe__shopping_list__user', 'ingredient'
+        ).annotate(total=Sum('amount')).order_by()
+        return {
+            (total['recipe__shopping_list__user'], total['ingredient']):
+                total['total']
+            for total in totals.iterator()
+        }
+
+    def get_stored_totals(self):
+        return {
+            (user_id, ingredient_id): amount
+            for user_id, ingredient_id, amount
+            in ShoppingCartIngredient.objects.values_list(
+                'user_id', 'ingredient_id', 'amount'
+            ).iterator()
+        }
+
+    @transaction.atomic
+    def rebuild(self, user_ids, live_totals):
+        ShoppingCartIngredient.objects.filter(user_id__in=user_ids).delete()
+        ShoppingCartIngredient.objects.bulk_create(
+            ShoppingCartIngredient(
+                user_id=user_id,
+                ingredient_id=ingredient_id,
+                amount=amount
+            )
+            for (user_id, ingredient_id), amount in live_totals.items()
+            if user_id in user_ids
+        )
+        bump_versions(*map(get_cart_version_name, user_ids))
+
+    def handle(self, *args, **options):
+        live_totals = self.get_live_totals()
+        stored_totals = self.get_stored_totals()
+        user_ids = {
+            user_id
+            for (user_id, _), _ in live_totals.items() ^ stored_totals.items()
+        }
+
+        if not user_ids:
+            self.stdout.write(
+                self.style.SUCCESS('Расхождений не найдено.')
+            )
+            return
+
+        self.stdout.write(
+            self.style.WARNING(
+                f'Расхождения у пользователей: '
+                f'{", ".join(map(str, sorted(user_ids)))}'
+            )
+        )
+        if options['rebuild']:
+            self.rebuild(user_ids, live_totals)
+            self.stdout.write(
+                self.style.SUCCESS('Агрегаты пересобраны.')
+            )
@@ -0,0 +1,64 @@
+# Generated by Django 3.2.3 on 2026-10-18 16:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from recipes.constants import FANOUT_MAX_FOLLOWERS, TIMELINE_BACKFILL_SIZE
+
+
+def fill_timelines(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Subscription = apps.get_model('users', 'Subscription')
+    TimelineEntry = apps.get_model('recipes', 'TimelineEntry')
+
+    subscriptions = Subscription.objects.filter(
+        author__followers_count__lte=FANOUT_MAX_FOLLOWERS
+    ).values_list('user_id', 'author_id')
+    for user_id, author_id in subscriptions.iterator():
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                author_id=author_id
+            )
+            for recipe_id in Recipe.objects.filter(
+                author_id=author_id
+            ).order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )[:TIMELINE_BACKFILL_SIZE]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0005_user_followers_count'),
+        ('recipes', '0008_shoppingcartingredient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='recipes.recipe', verbose_name='Рецепт')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'recipe'), name='timeline_entry_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', 'author'], name='timeline_user_author_idx'),
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+from recipes.constants import FANOUT_MAX_FOLLOWERS
+
+
+def mark_fanned_out(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.filter(
+        author__followers_count__gt=FANOUT_MAX_FOLLOWERS
+    ).update(fanned_out=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='fanned_out',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Разослан по лентам подписчиков'),
+        ),
+        migrations.RunPython(mark_fanned_out, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('fanned_out', False)), fields=['author', '-pub_date'], name='recipe_not_fanned_out_idx'),
+        ),
+    ]
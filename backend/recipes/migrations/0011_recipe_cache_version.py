@@ -0,0 +1,18 @@
+# Generated by Django 3.2.3 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_fanned_out'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='cache_version',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Версия кэша'),
+        ),
+    ]
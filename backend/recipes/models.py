@@ -1,11 +1,31 @@
+import heapq
+import time
+from collections import Counter, defaultdict
+from itertools import islice
+
 import base62
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField
+)
+from django.core.exceptions import EmptyResultSet
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connection, models
+from django.db.models.functions import Greatest, RowNumber
 
-from users.models import User
+from users.models import Subscription, User
 
+from .cache import (
+    bump_versions,
+    get_cart_version_name,
+    get_user_version_name,
+    invalidate_short_link
+)
 from .constants import (
     COOKING_TIME_VALIDATION_MESSAGE,
+    FANOUT_MAX_FOLLOWERS,
     INGREDIENT_AMOUNT_VALIDATION_MESSAGE,
     INGREDIENT_NAME_MAX_LENGTH,
     MAX_COOKING_TIME,
@@ -13,11 +33,19 @@ from .constants import (
     MEASUREMENT_MAX_LENGTH,
     MIN_COOKING_TIME,
     MIN_INGREDIENT_AMOUNT,
+    RECIPE_IMAGE_VARIANTS,
     RECIPE_NAME_MAX_LENGTH,
+    RECIPES_VERSION,
+    SEARCH_CONFIG,
+    SEARCH_FIELDS,
     SHORT_LINK_MAX_LENGTH,
     TAG_NAME_MAX_LENGTH,
-    TAG_SLUG_MAX_LENGTH
+    TAG_SLUG_MAX_LENGTH,
+    TIMELINE_BACKFILL_SIZE,
+    UNIT_CONVERSIONS
 )
+from .images import schedule_variants
+from .querysets import CreateOrIgnoreQuerySet, ReturningQuerySet
 
 
 class Ingredient(models.Model):
@@ -57,6 +85,115 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    def touch(self):
+        if self.update(cache_version=time.time_ns()):
+            bump_versions(RECIPES_VERSION)
+
+    def change_counter(self, field, delta):
+        return self.update(**{field: Greatest(models.F(field) + delta, 0)})
+
+    def for_read(self):
+        return self.select_related('author').defer(
+            'search_vector'
+        ).prefetch_related(
+            'tags',
+            models.Prefetch(
+                'ingredient_in_recipe',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredient'
+                ).only(
+                    'amount',
+                    'recipe',
+                    'ingredient__id',
+                    'ingredient__name',
+                    'ingredient__measurement_unit',
+                )
+            )
+        )
+
+    def latest_for_authors(self, author_ids, limit=None):
+        author_ids = list(author_ids)
+        if not author_ids:
+            return []
+        queryset = self.filter(author_id__in=author_ids).only(
+            'id', 'author', 'name', 'image', 'cooking_time', 'pub_date'
+        )
+        if limit is None:
+            return list(queryset)
+        try:
+            sql, params = queryset.annotate(
+                recipe_rank=models.Window(
+                    expression=RowNumber(),
+                    partition_by=[models.F('author_id')],
+                    order_by=[
+                        models.F('pub_date').desc(), models.F('id').desc()
+                    ]
+                )
+            ).order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        return list(self.raw(
+            f'SELECT * FROM ({sql}) AS ranked '
+            f'WHERE ranked.recipe_rank <= %s '
+            f'ORDER BY ranked.pub_date DESC, ranked.id DESC',
+            (*params, limit)
+        ))
+
+    def feed(self, user):
+        return Feed(user, self)
+
+    def next_id(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id'))",
+                [self.model._meta.db_table]
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, value):
+        if connection.vendor != 'postgresql':
+            return self.filter(
+                models.Q(name__icontains=value)
+                | models.Q(text__icontains=value)
+            ).annotate(
+                rank=models.Case(
+                    models.When(name__icontains=value, then=1),
+                    default=0,
+                    output_field=models.IntegerField()
+                )
+            ).order_by('-rank', '-pub_date')
+        query = SearchQuery(
+            value, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        return self.filter(search_vector=query).annotate(
+            rank=SearchRank(models.F('search_vector'), query)
+        ).order_by('-rank', '-pub_date')
+
+    def with_user_flags(self, user):
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+            )
+        return self.annotate(
+            is_favorited=models.Exists(
+                Favorite.objects.filter(
+                    user=user, recipe=models.OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingList.objects.filter(
+                    user=user, recipe=models.OuterRef('pk')
+                )
+            ),
+        )
+
+
 class Recipe(models.Model):
     author = models.ForeignKey(
         User,
@@ -98,21 +235,114 @@ class Recipe(models.Model):
         unique=True,
         verbose_name='Короткая ссылка',
     )
+    favorites_count = models.PositiveIntegerField(
+        'Число добавлений в избранное',
+        default=0,
+    )
+    shopping_cart_count = models.PositiveIntegerField(
+        'Число добавлений в список покупок',
+        default=0,
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+    )
+    cache_version = models.BigIntegerField(
+        'Версия кэша',
+        default=0,
+        editable=False,
+    )
+    fanned_out = models.BooleanField(
+        'Разослан по лентам подписчиков',
+        default=True,
+        editable=False,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='recipe_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='recipe_not_fanned_out_idx',
+                condition=models.Q(fanned_out=False)
+            )
+        ]
 
     @staticmethod
     def generate_slug(recipe_id):
         return base62.encode(recipe_id)
 
+    @staticmethod
+    def decode_slug(short_link):
+        return base62.decode(short_link)
+
+    def get_search_vector(self):
+        return (
+            SearchVector(
+                models.Value(self.name), weight='A', config=SEARCH_CONFIG
+            )
+            + SearchVector(
+                models.Value(self.text), weight='B', config=SEARCH_CONFIG
+            )
+        )
+
     def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        self.cache_version = time.time_ns()
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'cache_version'}
+        if connection.vendor == 'postgresql':
+            if self.id is None:
+                self.id = Recipe.objects.next_id()
+                kwargs['force_insert'] = True
+            if update_fields is None or SEARCH_FIELDS.intersection(
+                update_fields
+            ):
+                self.search_vector = self.get_search_vector()
+                if update_fields is not None:
+                    kwargs['update_fields'].add('search_vector')
+        if adding:
+            self.fanned_out = (
+                self.author.followers_count <= FANOUT_MAX_FOLLOWERS
+            )
+        if self.id is not None and not self.short_link:
+            self.short_link = self.generate_slug(self.id)
         super().save(*args, **kwargs)
         if not self.short_link:
             self.short_link = self.generate_slug(self.id)
             super().save(update_fields=['short_link'])
+        if adding:
+            User.objects.filter(id=self.author_id).update(
+                recipes_count=models.F('recipes_count') + 1
+            )
+            TimelineEntry.objects.fan_out(self)
+            invalidate_short_link(self.short_link)
+        if update_fields is None or 'image' in update_fields:
+            schedule_variants(
+                self.image,
+                RECIPE_IMAGE_VARIANTS,
+                Recipe.objects.filter(id=self.id).touch
+            )
+        bump_versions(RECIPES_VERSION)
+
+    @staticmethod
+    def get_ingredient_amounts(recipe_ids):
+        return dict(
+            IngredientInRecipe.objects.filter(
+                recipe_id__in=recipe_ids
+            ).values('ingredient_id').annotate(
+                total=models.Sum('amount')
+            ).values_list('ingredient_id', 'total')
+        )
 
     def __str__(self):
         return self.name
@@ -142,6 +372,8 @@ class IngredientInRecipe(models.Model):
         ]
     )
 
+    objects = ReturningQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Ингредиент в рецепте'
         verbose_name_plural = 'Ингредиенты в рецепте'
@@ -168,11 +400,26 @@ class UserRecipeRelation(models.Model):
         verbose_name='Рецепт'
     )
 
+    objects = CreateOrIgnoreQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
+    @classmethod
+    def change_relations(cls, relations, sign):
+        counts = Counter(relation.recipe_id for relation in relations)
+        for count in set(counts.values()):
+            Recipe.objects.filter(id__in=[
+                recipe_id for recipe_id, recipe_count in counts.items()
+                if recipe_count == count
+            ]).change_counter(cls.counter_field, sign * count)
+        bump_versions(*{
+            get_user_version_name(relation.user_id) for relation in relations
+        })
+
 
 class Favorite(UserRecipeRelation):
+    counter_field = 'favorites_count'
 
     class Meta:
         verbose_name = 'Избранное'
@@ -190,6 +437,7 @@ class Favorite(UserRecipeRelation):
 
 
 class ShoppingList(UserRecipeRelation):
+    counter_field = 'shopping_cart_count'
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -201,5 +449,284 @@ class ShoppingList(UserRecipeRelation):
             )
         ]
 
+    @classmethod
+    def change_relations(cls, relations, sign):
+        super().change_relations(relations, sign)
+        carts = defaultdict(list)
+        for relation in relations:
+            carts[relation.user_id].append(relation.recipe_id)
+        for user_id, recipe_ids in carts.items():
+            ShoppingCartIngredient.objects.change_totals(
+                (user_id,),
+                Recipe.get_ingredient_amounts(recipe_ids),
+                sign=sign
+            )
+        bump_versions(*map(get_cart_version_name, carts))
+
     def __str__(self):
         return f'{self.user} добавил в корзину {self.recipe}'
+
+
+class ShoppingCartIngredientQuerySet(models.QuerySet):
+    def change_totals(self, user_ids, amounts, sign=1):
+        user_ids = list(user_ids)
+        deltas = {
+            ingredient_id: sign * amount
+            for ingredient_id, amount in amounts.items()
+            if amount
+        }
+        if not user_ids or not deltas:
+            return
+        self.bulk_create(
+            [
+                self.model(user_id=user_id, ingredient_id=ingredient_id)
+                for user_id in user_ids
+                for ingredient_id, delta in deltas.items()
+                if delta > 0
+            ],
+            ignore_conflicts=True
+        )
+        totals = self.filter(user_id__in=user_ids, ingredient_id__in=deltas)
+        totals.update(amount=models.F('amount') + models.Case(
+            *[
+                models.When(ingredient_id=ingredient_id, then=delta)
+                for ingredient_id, delta in deltas.items()
+            ],
+            default=0,
+            output_field=models.IntegerField()
+        ))
+        totals.filter(amount__lte=0).delete()
+
+    def change_recipe_totals(self, recipe_id, deltas):
+        user_ids = list(ShoppingList.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('user_id', flat=True))
+        self.change_totals(user_ids, deltas)
+        bump_versions(*map(get_cart_version_name, user_ids))
+
+    def normalized_totals(self):
+        measurement_unit = models.Case(
+            *[
+                models.When(
+                    ingredient__measurement_unit=unit,
+                    then=models.Value(base_unit)
+                )
+                for unit, (base_unit, _) in UNIT_CONVERSIONS.items()
+            ],
+            default=models.F('ingredient__measurement_unit'),
+            output_field=models.CharField()
+        )
+        factor = models.Case(
+            *[
+                models.When(ingredient__measurement_unit=unit, then=factor)
+                for unit, (_, factor) in UNIT_CONVERSIONS.items()
+            ],
+            default=1,
+            output_field=models.IntegerField()
+        )
+        return self.values(
+            name=models.F('ingredient__name'),
+            measurement_unit=measurement_unit
+        ).annotate(
+            total_amount=models.Sum(models.F('amount') * factor)
+        ).order_by('name', 'measurement_unit')
+
+
+class ShoppingCartIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_ingredients',
+        verbose_name='Пользователь'
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_cart_ingredients',
+        verbose_name='Ингредиент'
+    )
+    amount = models.IntegerField('Количество', default=0)
+
+    objects = ShoppingCartIngredientQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Ингредиент в списке покупок'
+        verbose_name_plural = 'Ингредиенты в списке покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'),
+                name='shopping_cart_ingredient_unique'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.ingredient} в корзине {self.user}'
+
+
+class TimelineEntryQuerySet(models.QuerySet):
+    def fan_out(self, recipe):
+        if not recipe.fanned_out:
+            return
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=user_id,
+                    recipe_id=recipe.id,
+                    author_id=recipe.author_id,
+                    pub_date=recipe.pub_date
+                )
+                for user_id in Subscription.objects.filter(
+                    author_id=recipe.author_id
+                ).values_list('user_id', flat=True).iterator()
+            ],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+
+    def backfill(self, user_id, author_ids):
+        self.bulk_create(
+            [
+                self.model(
+                    user_id=user_id,
+                    recipe_id=recipe.id,
+                    author_id=recipe.author_id,
+                    pub_date=recipe.pub_date
+                )
+                for recipe in Recipe.objects.filter(
+                    fanned_out=True
+                ).latest_for_authors(author_ids, TIMELINE_BACKFILL_SIZE)
+            ],
+            ignore_conflicts=True
+        )
+
+    def trim(self, user_id, author_ids):
+        return self.filter(user_id=user_id, author_id__in=author_ids).delete()
+
+    def change_subscriptions(self, subscriptions, sign):
+        followers = Counter(
+            subscription.author_id for subscription in subscriptions
+        )
+        for count in set(followers.values()):
+            User.objects.filter(id__in=[
+                author_id for author_id, author_count in followers.items()
+                if author_count == count
+            ]).update(followers_count=Greatest(
+                models.F('followers_count') + sign * count, 0
+            ))
+        authors = defaultdict(list)
+        for subscription in subscriptions:
+            authors[subscription.user_id].append(subscription.author_id)
+        for user_id, author_ids in authors.items():
+            if sign > 0:
+                self.backfill(user_id, author_ids)
+            else:
+                self.trim(user_id, author_ids)
+        bump_versions(*map(get_user_version_name, authors))
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Рецепт'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    objects = TimelineEntryQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'),
+                name='timeline_entry_unique'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', 'author'),
+                name='timeline_user_author_idx'
+            ),
+            models.Index(
+                fields=('user', '-pub_date', '-recipe'),
+                name='timeline_user_pub_date_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} в ленте {self.user}'
+
+
+class Feed:
+    def __init__(self, user, recipes, ordering=('-pub_date', '-id'),
+                 position=None):
+        self.user = user
+        self.recipes = recipes
+        self.ordering = ordering
+        self.position = position or {}
+
+    def order_by(self, *ordering):
+        return Feed(self.user, self.recipes, ordering, self.position)
+
+    def filter(self, **position):
+        return Feed(
+            self.user, self.recipes, self.ordering,
+            {**self.position, **position}
+        )
+
+    def get_timeline(self, prefix, limit):
+        entries = TimelineEntry.objects.filter(
+            user=self.user, **self.position
+        )
+        if self.recipes.query.has_filters():
+            entries = entries.filter(recipe__in=self.recipes.values('id'))
+        return entries.order_by(
+            f'{prefix}pub_date', f'{prefix}recipe_id'
+        ).values_list('pub_date', 'recipe_id')[:limit]
+
+    def get_not_fanned_out(self, prefix, limit):
+        author_ids = Subscription.objects.filter(user=self.user).filter(
+            models.Exists(Recipe.objects.filter(
+                author=models.OuterRef('author'), fanned_out=False
+            ))
+        ).values_list('author', flat=True)
+        return [
+            self.recipes.filter(
+                author=author_id, fanned_out=False, **self.position
+            ).order_by(
+                f'{prefix}pub_date', f'{prefix}id'
+            ).values_list('pub_date', 'id')[:limit]
+            for author_id in author_ids
+        ]
+
+    def __getitem__(self, index):
+        prefix = '-' if self.ordering[0].startswith('-') else ''
+        ids = [
+            recipe_id for _, recipe_id in islice(
+                heapq.merge(
+                    self.get_timeline(prefix, index.stop),
+                    *self.get_not_fanned_out(prefix, index.stop),
+                    reverse=bool(prefix)
+                ),
+                index.start,
+                index.stop
+            )
+        ]
+        recipes = self.recipes.in_bulk(ids)
+        return [
+            recipes[recipe_id] for recipe_id in ids if recipe_id in recipes
+        ]
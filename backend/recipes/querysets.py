@@ -0,0 +1,83 @@
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, models
+from django.dispatch import Signal
+
+rows_created = Signal()
+rows_deleted = Signal()
+
+
+class ReturningQuerySet(models.QuerySet):
+    def _execute_returning(self, sql, params):
+        connection = connections[self.db]
+        fields = self.model._meta.concrete_fields
+        quote_name = connection.ops.quote_name
+        sql = f'{sql} RETURNING ' + ', '.join(
+            quote_name(field.column) for field in fields
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        field_names = [field.attname for field in fields]
+        return [
+            self.model.from_db(self.db, field_names, row) for row in rows
+        ]
+
+    def delete_returning(self):
+        opts = self.model._meta
+        connection = connections[self.db]
+        try:
+            sql, params = self.values('pk').order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        quote_name = connection.ops.quote_name
+        instances = self._execute_returning(
+            f'DELETE FROM {quote_name(opts.db_table)} '
+            f'WHERE {quote_name(opts.pk.column)} IN ({sql})',
+            params
+        )
+        if instances:
+            rows_deleted.send(
+                sender=self.model, instances=instances, using=self.db
+            )
+        return instances
+
+
+class CreateOrIgnoreQuerySet(ReturningQuerySet):
+    def bulk_create_or_ignore(self, objs):
+        if not objs:
+            return []
+        opts = self.model._meta
+        connection = connections[self.db]
+        fields = [
+            field for field in opts.concrete_fields if not field.primary_key
+        ]
+        quote_name = connection.ops.quote_name
+        placeholders = f'({", ".join(["%s"] * len(fields))})'
+        instances = self._execute_returning(
+            f'INSERT INTO {quote_name(opts.db_table)} '
+            f'({", ".join(quote_name(field.column) for field in fields)}) '
+            f'VALUES {", ".join([placeholders] * len(objs))} '
+            f'ON CONFLICT DO NOTHING',
+            [
+                field.get_db_prep_save(
+                    getattr(obj, field.attname), connection
+                )
+                for obj in objs
+                for field in fields
+            ]
+        )
+        if instances:
+            rows_created.send(
+                sender=self.model, instances=instances, using=self.db
+            )
+        return instances
+
+    def create_or_ignore(self, **values):
+        instance = self.model(**values)
+        created = self.bulk_create_or_ignore([instance])
+        if not created:
+            return None
+        instance.pk = created[0].pk
+        instance._state.adding = False
+        instance._state.db = self.db
+        return instance
@@ -0,0 +1,133 @@
+from collections import defaultdict
+
+from django.db import models
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from users.models import Subscription, User
+
+from .cache import bump_versions, invalidate_short_link
+from .constants import INGREDIENTS_VERSION, RECIPES_VERSION, TAGS_VERSION
+from .models import (
+    Favorite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCartIngredient,
+    ShoppingList,
+    Tag,
+    TimelineEntry
+)
+from .querysets import rows_created, rows_deleted
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_versions(INGREDIENTS_VERSION)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_versions(TAGS_VERSION)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+def relation_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        sender.change_relations([instance], 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingList)
+def relation_deleted(sender, instance, **kwargs):
+    sender.change_relations([instance], -1)
+
+
+@receiver(rows_created, sender=Favorite)
+@receiver(rows_created, sender=ShoppingList)
+def relations_created(sender, instances, **kwargs):
+    sender.change_relations(instances, 1)
+
+
+@receiver(rows_deleted, sender=Favorite)
+@receiver(rows_deleted, sender=ShoppingList)
+def relations_deleted(sender, instances, **kwargs):
+    sender.change_relations(instances, -1)
+
+
+@receiver(pre_save, sender=IngredientInRecipe)
+def ingredient_in_recipe_saving(sender, instance, raw=False, **kwargs):
+    instance._previous = None
+    if not raw and not instance._state.adding:
+        instance._previous = sender.objects.filter(
+            pk=instance.pk
+        ).values_list('ingredient_id', 'amount').first()
+
+
+@receiver(post_save, sender=IngredientInRecipe)
+def ingredient_in_recipe_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    deltas = defaultdict(int)
+    deltas[instance.ingredient_id] += instance.amount
+    if instance._previous is not None:
+        ingredient_id, amount = instance._previous
+        deltas[ingredient_id] -= amount
+    ShoppingCartIngredient.objects.change_recipe_totals(
+        instance.recipe_id, deltas
+    )
+    Recipe.objects.filter(id=instance.recipe_id).touch()
+
+
+@receiver(post_delete, sender=IngredientInRecipe)
+def ingredient_in_recipe_deleted(sender, instance, **kwargs):
+    ingredients_in_recipe_deleted(sender, [instance])
+
+
+@receiver(rows_deleted, sender=IngredientInRecipe)
+def ingredients_in_recipe_deleted(sender, instances, **kwargs):
+    recipe_deltas = defaultdict(lambda: defaultdict(int))
+    for instance in instances:
+        recipe_deltas[instance.recipe_id][
+            instance.ingredient_id
+        ] -= instance.amount
+    for recipe_id, deltas in recipe_deltas.items():
+        ShoppingCartIngredient.objects.change_recipe_totals(
+            recipe_id, deltas
+        )
+    if recipe_deltas:
+        Recipe.objects.filter(id__in=list(recipe_deltas)).touch()
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    User.objects.filter(id=instance.author_id).update(
+        recipes_count=Greatest(models.F('recipes_count') - 1, 0)
+    )
+    bump_versions(RECIPES_VERSION)
+    invalidate_short_link(instance.short_link)
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        TimelineEntry.objects.change_subscriptions([instance], 1)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    TimelineEntry.objects.change_subscriptions([instance], -1)
+
+
+@receiver(rows_created, sender=Subscription)
+def subscriptions_created(sender, instances, **kwargs):
+    TimelineEntry.objects.change_subscriptions(instances, 1)
+
+
+@receiver(rows_deleted, sender=Subscription)
+def subscriptions_deleted(sender, instances, **kwargs):
+    TimelineEntry.objects.change_subscriptions(instances, -1)
@@ -0,0 +1,38 @@
+import hashlib
+import os
+
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage
+
+from .constants import CONTENT_HASH_NAME
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, filename = os.path.split(name)
+        return os.path.join(directory, CONTENT_HASH_NAME.format(
+            digest=digest.hexdigest(),
+            extension=os.path.splitext(filename)[1].lower()
+        ))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_derived(self, name, content):
+        if self.exists(name):
+            return name
+        return super().save(name, content)
+
+    def delete(self, name):
+        pass
@@ -1,18 +1,62 @@
 from django.conf import settings
-from django.core.exceptions import ValidationError
+from django.core.cache import cache
+from django.http import Http404
 from django.shortcuts import redirect
-from rest_framework import status
 
+from recipes.cache import (
+    get_local_short_link,
+    get_short_link_cache_key,
+    set_local_short_link
+)
+from recipes.constants import (
+    SHORT_LINK_MAX_LENGTH,
+    SHORT_LINK_MISSING,
+    SHORT_LINK_NEGATIVE_TIMEOUT,
+    SHORT_LINK_TIMEOUT
+)
 from recipes.models import Recipe
 
 
-def redirect_short_link(request, short_link):
+def fetch_recipe_id(short_link):
+    key = get_short_link_cache_key(short_link)
+    recipe_id = cache.get(key)
+    if recipe_id is not None:
+        return recipe_id
     try:
-        recipe = Recipe.objects.get(short_link=short_link)
-    except Recipe.DoesNotExist:
-        raise ValidationError(message='Рецепт ненайден',
-                              code=status.HTTP_404_NOT_FOUND)
+        recipe_id = Recipe.decode_slug(short_link)
+    except ValueError:
+        recipe_id = SHORT_LINK_MISSING
+    if recipe_id != SHORT_LINK_MISSING and (
+        Recipe.generate_slug(recipe_id) != short_link
+        or not Recipe.objects.filter(
+            id=recipe_id, short_link=short_link
+        ).exists()
+    ):
+        recipe_id = SHORT_LINK_MISSING
+    cache.set(
+        key,
+        recipe_id,
+        SHORT_LINK_NEGATIVE_TIMEOUT if recipe_id == SHORT_LINK_MISSING
+        else SHORT_LINK_TIMEOUT
+    )
+    return recipe_id
+
+
+def resolve_short_link(short_link):
+    recipe_id = get_local_short_link(short_link)
+    if recipe_id is None:
+        recipe_id = fetch_recipe_id(short_link)
+        set_local_short_link(short_link, recipe_id)
+    return recipe_id
+
+
+def redirect_short_link(request, short_link):
+    if len(short_link) > SHORT_LINK_MAX_LENGTH:
+        raise Http404('Рецепт не найден')
+    recipe_id = resolve_short_link(short_link)
+    if recipe_id == SHORT_LINK_MISSING:
+        raise Http404('Рецепт не найден')
 
     return redirect(
-        f'{settings.SITE_URL}/recipes/{recipe.id}/'
+        f'{settings.SITE_URL}/recipes/{recipe_id}/'
     )
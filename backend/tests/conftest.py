@@ -0,0 +1,102 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from recipes.cache import _short_links
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    _short_links.clear()
+    yield
+    cache.clear()
+    _short_links.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        email='user@foodgram.ru',
+        username='user',
+        first_name='Иван',
+        last_name='Иванов',
+        password='Foodgram-password-1'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        email='another@foodgram.ru',
+        username='another',
+        first_name='Пётр',
+        last_name='Петров',
+        password='Foodgram-password-2'
+    )
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def another_user_client(another_user):
+    client = APIClient()
+    client.force_authenticate(another_user)
+    return client
+
+
+@pytest.fixture
+def tags(db):
+    return [
+        Tag.objects.create(name='Завтрак', slug='breakfast'),
+        Tag.objects.create(name='Обед', slug='lunch'),
+    ]
+
+
+@pytest.fixture
+def ingredients(db):
+    return [
+        Ingredient.objects.create(name='мука', measurement_unit='г'),
+        Ingredient.objects.create(name='молоко', measurement_unit='мл'),
+        Ingredient.objects.create(name='яйца', measurement_unit='шт.'),
+    ]
+
+
+@pytest.fixture
+def create_recipes(tags, ingredients):
+    def create(author, count, amount=100):
+        recipes = []
+        for number in range(count):
+            recipe = Recipe.objects.create(
+                author=author,
+                name=f'Рецепт {number}',
+                text='Описание рецепта',
+                cooking_time=10,
+                image='recipes/images/recipe.png'
+            )
+            recipe.tags.set(tags)
+            IngredientInRecipe.objects.bulk_create(
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+                for ingredient in ingredients
+            )
+            recipes.append(recipe)
+        return recipes
+    return create
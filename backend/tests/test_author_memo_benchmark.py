@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.recipes.serializers import (
+    RecipeFragmentSerializer,
+    RecipeListSerializer
+)
+from api.users.serializers import UserSerializer
+from recipes.models import Recipe
+
+pytestmark = pytest.mark.benchmark
+
+RECIPES_URL = '/api/recipes/'
+AUTHORS_COUNT = 5
+RECIPES_PER_AUTHOR = 20
+REPEATS = 20
+
+
+class PlainFragmentSerializer(RecipeFragmentSerializer):
+    author = UserSerializer(read_only=True)
+
+
+class PlainRecipeListSerializer(RecipeListSerializer):
+    author = UserSerializer(read_only=True)
+
+    def _get_fragment(self, recipe):
+        return PlainFragmentSerializer(recipe).data
+
+    def _get_author(self, recipe, fragment):
+        return dict(
+            fragment['author'],
+            is_subscribed=self.fields['author'].get_is_subscribed(
+                recipe.author
+            ),
+            avatar=self._build_url(fragment['author']['avatar'])
+        )
+
+
+@pytest.fixture
+def page(django_user_model, user, create_recipes):
+    for number in range(AUTHORS_COUNT):
+        author = django_user_model.objects.create_user(
+            email=f'author{number}@foodgram.ru',
+            username=f'author{number}',
+            first_name='Автор',
+            last_name=f'Номер {number}',
+            password='Foodgram-password-3'
+        )
+        create_recipes(author, RECIPES_PER_AUTHOR)
+    return list(Recipe.objects.with_user_flags(user).for_read())
+
+
+def measure(serializer_class, recipes, user):
+    timings = []
+    for _ in range(REPEATS):
+        request = APIRequestFactory().get(RECIPES_URL)
+        force_authenticate(request, user)
+        cache.clear()
+        start = time.process_time()
+        data = serializer_class(
+            recipes, many=True, context={'request': Request(request)}
+        ).data
+        timings.append(time.process_time() - start)
+    return min(timings), data
+
+
+@pytest.mark.django_db
+def test_author_memo_benchmark(user, page, capsys):
+    plain_time, plain_data = measure(PlainRecipeListSerializer, page, user)
+    memo_time, memo_data = measure(RecipeListSerializer, page, user)
+
+    assert len(page) == AUTHORS_COUNT * RECIPES_PER_AUTHOR
+    assert len({recipe.author_id for recipe in page}) == AUTHORS_COUNT
+    assert memo_data == plain_data
+    with capsys.disabled():
+        print(
+            f'\nСтраница из {len(page)} рецептов от {AUTHORS_COUNT} '
+            f'авторов: без мемоизации {plain_time * 1000:.1f} мс CPU, '
+            f'с мемоизацией {memo_time * 1000:.1f} мс CPU'
+        )
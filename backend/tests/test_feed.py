@@ -0,0 +1,88 @@
+import pytest
+
+from recipes.constants import FANOUT_MAX_FOLLOWERS
+from recipes.models import Recipe, TimelineEntry
+from users.models import Subscription
+
+FEED_URL = '/api/recipes/feed/'
+PAGE_SIZE = 2
+
+
+@pytest.fixture
+def feed(django_user_model, user, another_user, create_recipes):
+    celebrity = django_user_model.objects.create_user(
+        email='celebrity@foodgram.ru',
+        username='celebrity',
+        first_name='Известный',
+        last_name='Повар',
+        password='Foodgram-password-3'
+    )
+    stranger = django_user_model.objects.create_user(
+        email='stranger@foodgram.ru',
+        username='stranger',
+        first_name='Незнакомый',
+        last_name='Повар',
+        password='Foodgram-password-4'
+    )
+    Subscription.objects.create(user=user, author=another_user)
+    Subscription.objects.create(user=user, author=celebrity)
+    django_user_model.objects.filter(id=celebrity.id).update(
+        followers_count=FANOUT_MAX_FOLLOWERS + 1
+    )
+    celebrity.refresh_from_db()
+    recipes = []
+    for _ in range(3):
+        recipes += create_recipes(another_user, 1)
+        recipes += create_recipes(celebrity, 1)
+        create_recipes(stranger, 1)
+    return sorted(
+        recipes, key=lambda recipe: (recipe.pub_date, recipe.id),
+        reverse=True
+    )
+
+
+def collect(client, url, link):
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        pages.append(response.data)
+        url = response.data[link]
+    return pages
+
+
+def get_ids(pages):
+    return [[recipe['id'] for recipe in page['results']] for page in pages]
+
+
+@pytest.mark.django_db
+def test_feed_merges_timeline_and_not_fanned_out_recipes(user_client, feed):
+    assert {recipe.fanned_out for recipe in feed} == {True, False}
+    assert not TimelineEntry.objects.filter(
+        recipe__fanned_out=False
+    ).exists()
+
+    pages = collect(user_client, f'{FEED_URL}?limit={PAGE_SIZE}', 'next')
+    ids = get_ids(pages)
+
+    assert [recipe_id for page in ids for recipe_id in page] == [
+        recipe.id for recipe in feed
+    ]
+    assert all(len(page) == PAGE_SIZE for page in ids)
+    assert get_ids(
+        collect(user_client, pages[-1]['previous'], 'previous')
+    ) == ids[-2::-1]
+
+
+@pytest.mark.django_db
+def test_feed_applies_recipe_filters(user_client, feed, tags):
+    tagged = feed[::2]
+    for recipe in feed:
+        if recipe not in tagged:
+            Recipe.tags.through.objects.filter(recipe=recipe).delete()
+
+    response = user_client.get(FEED_URL, {'tags': tags[0].slug})
+
+    assert [recipe['id'] for recipe in response.data['results']] == [
+        recipe.id for recipe in tagged
+    ]
@@ -0,0 +1,55 @@
+import base64
+import io
+import os
+import tracemalloc
+
+import pytest
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+
+from api.fields import StreamingBase64ImageField
+from recipes.constants import IMAGE_MAX_SIZE
+
+pytestmark = pytest.mark.benchmark
+
+IMAGE_SIDE = 1150
+
+
+@pytest.fixture(scope='module')
+def data_uri():
+    image = Image.frombytes(
+        'RGB', (IMAGE_SIDE, IMAGE_SIDE), os.urandom(IMAGE_SIDE ** 2 * 3)
+    )
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    assert buffer.tell() <= IMAGE_MAX_SIZE
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+def measure(field, data):
+    tracemalloc.start()
+    try:
+        file = field.to_internal_value(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    file.seek(0)
+    return peak, file.read()
+
+
+def test_image_decode_peak_memory(data_uri, capsys):
+    plain_peak, plain_content = measure(Base64ImageField(), data_uri)
+    streaming_peak, streaming_content = measure(
+        StreamingBase64ImageField(), data_uri
+    )
+
+    assert streaming_content == plain_content
+    assert streaming_peak < plain_peak
+    with capsys.disabled():
+        print(
+            f'\nИзображение {len(plain_content) // 1024} КБ: пик памяти '
+            f'Base64ImageField {plain_peak // 1024} КБ, '
+            f'StreamingBase64ImageField {streaming_peak // 1024} КБ'
+        )
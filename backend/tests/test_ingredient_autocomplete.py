@@ -0,0 +1,53 @@
+import pytest
+
+from recipes.models import Ingredient
+
+INGREDIENTS_URL = '/api/ingredients/'
+
+
+def autocomplete(client, name):
+    response = client.get(INGREDIENTS_URL, {'name': name})
+    assert response.status_code == 200
+    return [ingredient['name'] for ingredient in response.data]
+
+
+@pytest.mark.django_db
+def test_autocomplete_ranks_exact_match_first(api_client):
+    Ingredient.objects.bulk_create([
+        Ingredient(name='мука пшеничная', measurement_unit='г'),
+        Ingredient(name='Мука', measurement_unit='г'),
+        Ingredient(name='молоко', measurement_unit='мл'),
+    ])
+
+    assert autocomplete(api_client, 'МУКА') == ['Мука', 'мука пшеничная']
+
+
+@pytest.mark.django_db
+def test_autocomplete_forgets_deleted_ingredients(
+    api_client, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.create(name='ёлочные иглы', measurement_unit='г')
+    assert autocomplete(api_client, 'елоч') == ['ёлочные иглы']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingredient.objects.filter(name='ёлочные иглы').delete()
+
+    assert autocomplete(api_client, 'елоч') == []
+
+
+@pytest.mark.django_db
+def test_autocomplete_sees_renamed_ingredients(
+    api_client, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        ingredient = Ingredient.objects.create(
+            name='сахар', measurement_unit='г'
+        )
+    assert autocomplete(api_client, 'сах') == ['сахар']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ingredient.name = 'сахарная пудра'
+        ingredient.save()
+
+    assert autocomplete(api_client, 'сах') == ['сахарная пудра']
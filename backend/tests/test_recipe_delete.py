@@ -0,0 +1,55 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe, ShoppingCartIngredient, ShoppingList
+
+RECIPE_URL = '/api/recipes/{recipe_id}/'
+
+
+def delete_by_api(client, recipe):
+    response = client.delete(RECIPE_URL.format(recipe_id=recipe.id))
+    assert response.status_code == 204
+
+
+def delete_by_orm(client, recipe):
+    recipe.delete()
+
+
+def delete_author(client, recipe):
+    recipe.author.delete()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    'delete', (delete_by_api, delete_by_orm, delete_author)
+)
+def test_deleting_recipe_keeps_carts_consistent(
+    user, another_user, django_user_model, create_recipes, delete, capsys
+):
+    author = django_user_model.objects.create_user(
+        email='author@foodgram.ru',
+        username='author',
+        first_name='Автор',
+        last_name='Рецептов',
+        password='Foodgram-password-3'
+    )
+    deleted = create_recipes(author, 1, amount=30)[0]
+    kept = create_recipes(another_user, 1, amount=5)[0]
+    for holder in (user, another_user):
+        for recipe in (deleted, kept):
+            ShoppingList.objects.create(user=holder, recipe=recipe)
+            holder.favorites.create(recipe=recipe)
+    client = APIClient()
+    client.force_authenticate(author)
+
+    delete(client, deleted)
+
+    assert set(ShoppingCartIngredient.objects.values_list(
+        'user_id', 'amount'
+    )) == {(user.id, 5), (another_user.id, 5)}
+    kept = Recipe.objects.get(id=kept.id)
+    assert kept.favorites_count == kept.shopping_cart_count == 2
+    capsys.readouterr()
+    call_command('verify_shopping_carts')
+    assert 'Расхождений не найдено' in capsys.readouterr().out
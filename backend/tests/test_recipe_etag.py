@@ -0,0 +1,46 @@
+import pytest
+
+RECIPES_URL = '/api/recipes/'
+RECIPE_URL = '/api/recipes/{recipe_id}/'
+
+
+def rename_tag(tags, ingredients):
+    tags[0].name = 'Поздний завтрак'
+    tags[0].save()
+    return 'tags', tags[0].name
+
+
+def rename_ingredient(tags, ingredients):
+    ingredients[0].name = 'мука ржаная'
+    ingredients[0].save()
+    return 'ingredients', ingredients[0].name
+
+
+def get_names(recipe, field):
+    return [item['name'] for item in recipe[field]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('detail', (False, True))
+@pytest.mark.parametrize('rename', (rename_tag, rename_ingredient))
+def test_renaming_invalidates_recipe_etag(
+    api_client, user, tags, ingredients, create_recipes, rename, detail,
+    django_capture_on_commit_callbacks
+):
+    recipe = create_recipes(user, 1)[0]
+    url = RECIPE_URL.format(recipe_id=recipe.id) if detail else RECIPES_URL
+    response = api_client.get(url)
+    assert response.status_code == 200
+    etag = response['ETag']
+    assert api_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        field, name = rename(tags, ingredients)
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    data = response.data if detail else response.data['results'][0]
+    assert name in get_names(data, field)
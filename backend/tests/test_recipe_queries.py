@@ -0,0 +1,89 @@
+import pytest
+
+from recipes.models import Favorite, ShoppingList
+
+RECIPES_URL = '/api/recipes/'
+ANONYMOUS_LIST_QUERIES = 5
+AUTHENTICATED_LIST_QUERIES = 6
+ANONYMOUS_DETAIL_QUERIES = 4
+AUTHENTICATED_DETAIL_QUERIES = 5
+
+
+@pytest.mark.parametrize('limit', (5, 50))
+def test_anonymous_recipe_list_queries(
+    api_client, user, create_recipes, django_assert_num_queries, limit
+):
+    create_recipes(user, 50)
+
+    with django_assert_num_queries(ANONYMOUS_LIST_QUERIES):
+        response = api_client.get(RECIPES_URL, {'limit': limit})
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == limit
+    assert not any(
+        recipe['is_favorited'] or recipe['is_in_shopping_cart']
+        for recipe in response.data['results']
+    )
+
+
+@pytest.mark.parametrize('limit', (5, 50))
+def test_authenticated_recipe_list_queries(
+    user_client, user, another_user, create_recipes,
+    django_assert_num_queries, limit
+):
+    recipes = create_recipes(another_user, 50)
+    Favorite.objects.bulk_create(
+        Favorite(user=user, recipe=recipe) for recipe in recipes[::2]
+    )
+    ShoppingList.objects.bulk_create(
+        ShoppingList(user=user, recipe=recipe) for recipe in recipes[::3]
+    )
+    favorited = {recipe.id for recipe in recipes[::2]}
+    in_shopping_cart = {recipe.id for recipe in recipes[::3]}
+
+    with django_assert_num_queries(AUTHENTICATED_LIST_QUERIES):
+        response = user_client.get(RECIPES_URL, {'limit': limit})
+
+    assert response.status_code == 200
+    assert len(response.data['results']) == limit
+    for recipe in response.data['results']:
+        assert recipe['is_favorited'] == (recipe['id'] in favorited)
+        assert recipe['is_in_shopping_cart'] == (
+            recipe['id'] in in_shopping_cart
+        )
+
+
+@pytest.mark.parametrize('count', (1, 20))
+def test_recipe_list_query_budget_ignores_recipe_size(
+    api_client, user, tags, ingredients, create_recipes,
+    django_assert_num_queries, count
+):
+    create_recipes(user, count)
+
+    with django_assert_num_queries(ANONYMOUS_LIST_QUERIES):
+        response = api_client.get(RECIPES_URL)
+
+    assert response.status_code == 200
+    recipe = response.data['results'][0]
+    assert len(recipe['tags']) == len(tags)
+    assert len(recipe['ingredients']) == len(ingredients)
+
+
+@pytest.mark.parametrize('client_name, queries', (
+    ('api_client', ANONYMOUS_DETAIL_QUERIES),
+    ('user_client', AUTHENTICATED_DETAIL_QUERIES),
+))
+def test_recipe_detail_queries(
+    request, another_user, tags, ingredients, create_recipes,
+    django_assert_num_queries, client_name, queries
+):
+    client = request.getfixturevalue(client_name)
+    recipe, = create_recipes(another_user, 1)
+
+    with django_assert_num_queries(queries):
+        response = client.get(f'{RECIPES_URL}{recipe.id}/')
+
+    assert response.status_code == 200
+    assert len(response.data['tags']) == len(tags)
+    assert len(response.data['ingredients']) == len(ingredients)
+    assert response.data['author']['id'] == another_user.id
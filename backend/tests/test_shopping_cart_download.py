@@ -0,0 +1,57 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+
+from recipes.models import IngredientInRecipe, Recipe, ShoppingList
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+ROUNDS = 20
+
+
+def create_cart(user, ingredient, amount):
+    recipe = Recipe.objects.create(
+        author=user,
+        name=f'Рецепт {user.username}',
+        text='Описание рецепта',
+        cooking_time=10,
+        image='recipes/images/recipe.png'
+    )
+    IngredientInRecipe.objects.create(
+        recipe=recipe, ingredient=ingredient, amount=amount
+    )
+    ShoppingList.objects.create(user=user, recipe=recipe)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('extension', ('txt', 'csv', 'json'))
+def test_concurrent_downloads_are_isolated(
+    user, another_user, user_client, another_user_client, ingredients,
+    extension
+):
+    flour, milk, _ = ingredients
+    create_cart(user, flour, 150)
+    create_cart(another_user, milk, 300)
+    barrier = threading.Barrier(2)
+
+    def download(client):
+        try:
+            barrier.wait()
+            response = client.get(DOWNLOAD_URL, {'format': extension})
+            return response.status_code, b''.join(
+                response.streaming_content
+            ).decode()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for _ in range(ROUNDS):
+            own, other = executor.map(
+                download, (user_client, another_user_client)
+            )
+            assert own[0] == other[0] == 200
+            assert flour.name in own[1] and '150' in own[1]
+            assert milk.name not in own[1]
+            assert milk.name in other[1] and '300' in other[1]
+            assert flour.name not in other[1]
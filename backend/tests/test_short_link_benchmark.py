@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from django.core.cache import cache
+
+from recipes.cache import _short_links
+from recipes.models import Recipe
+
+pytestmark = pytest.mark.benchmark
+
+SHORT_LINK_URL = '/s/{short_link}/'
+RECIPES_COUNT = 100
+REPEATS = 5
+MISSING_RECIPE_ID = 10 ** 9
+INVALID_SHORT_LINK = '!'
+
+
+def reset_all():
+    cache.clear()
+    _short_links.clear()
+
+
+def reset_local():
+    _short_links.clear()
+
+
+def reset_nothing():
+    pass
+
+
+def measure(client, urls, reset, status_code):
+    rates = []
+    for _ in range(REPEATS):
+        elapsed = 0
+        for url in urls:
+            reset()
+            start = time.perf_counter()
+            response = client.get(url)
+            elapsed += time.perf_counter() - start
+            assert response.status_code == status_code
+        rates.append(len(urls) / elapsed)
+    return max(rates)
+
+
+@pytest.mark.django_db
+def test_short_link_redirect_benchmark(client, user, capsys):
+    Recipe.objects.bulk_create(
+        Recipe(
+            id=number,
+            author=user,
+            name=f'Рецепт {number}',
+            text='Описание рецепта',
+            cooking_time=10,
+            image='recipes/images/recipe.png',
+            short_link=Recipe.generate_slug(number)
+        )
+        for number in range(1, RECIPES_COUNT + 1)
+    )
+    urls = [
+        SHORT_LINK_URL.format(short_link=Recipe.generate_slug(number))
+        for number in range(1, RECIPES_COUNT + 1)
+    ]
+    missing_urls = [
+        SHORT_LINK_URL.format(
+            short_link=Recipe.generate_slug(MISSING_RECIPE_ID)
+        ),
+        SHORT_LINK_URL.format(short_link=INVALID_SHORT_LINK),
+    ]
+
+    cold = measure(client, urls, reset_all, 302)
+    for url in urls:
+        client.get(url)
+    shared = measure(client, urls, reset_local, 302)
+    local = measure(client, urls, reset_nothing, 302)
+    missing_cold = measure(client, missing_urls, reset_all, 404)
+    missing_cached = measure(client, missing_urls, reset_nothing, 404)
+
+    with capsys.disabled():
+        print(
+            f'\nПереходы по коротким ссылкам, запросов в секунду: '
+            f'без кэша {cold:.0f}, общий кэш {shared:.0f}, '
+            f'локальный кэш {local:.0f}; несуществующие ссылки: '
+            f'без кэша {missing_cold:.0f}, из кэша {missing_cached:.0f}'
+        )
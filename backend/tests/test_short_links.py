@@ -0,0 +1,32 @@
+import pytest
+from django.conf import settings
+
+from recipes.models import Recipe
+
+SHORT_LINK_URL = '/s/{short_link}/'
+
+
+@pytest.mark.django_db
+def test_short_link_redirects_to_recipe(client, user, create_recipes):
+    recipe = create_recipes(user, 1)[0]
+
+    response = client.get(SHORT_LINK_URL.format(short_link=recipe.short_link))
+
+    assert response.status_code == 302
+    assert response['Location'] == (
+        f'{settings.SITE_URL}/recipes/{recipe.id}/'
+    )
+
+
+@pytest.mark.django_db
+def test_deleted_recipe_short_link_returns_404(
+    client, user, create_recipes, django_capture_on_commit_callbacks
+):
+    recipe = create_recipes(user, 1)[0]
+    url = SHORT_LINK_URL.format(short_link=recipe.short_link)
+    assert client.get(url).status_code == 302
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Recipe.objects.get(id=recipe.id).delete()
+
+    assert client.get(url).status_code == 404
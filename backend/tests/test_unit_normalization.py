@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+from django.conf import settings
+
+from recipes.models import Ingredient, ShoppingCartIngredient
+
+INGREDIENTS_PATH = os.path.join(settings.BASE_DIR, 'data', 'ingredients.json')
+NORMALIZED_UNITS = {
+    'г': ('г', 1),
+    'кг': ('г', 1000),
+    'мл': ('мл', 1),
+    'л': ('мл', 1000),
+    'шт': ('шт.', 1),
+    'шт.': ('шт.', 1),
+}
+
+
+def load_units():
+    with open(INGREDIENTS_PATH, encoding='UTF-8') as file:
+        return sorted({
+            ingredient['measurement_unit'] for ingredient in json.load(file)
+        })
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('unit', load_units())
+def test_catalog_unit_normalization(user, unit):
+    ingredient = Ingredient.objects.create(
+        name='продукт', measurement_unit=unit
+    )
+    ShoppingCartIngredient.objects.create(
+        user=user, ingredient=ingredient, amount=3
+    )
+    base_unit, factor = NORMALIZED_UNITS.get(unit, (unit, 1))
+
+    totals = list(
+        ShoppingCartIngredient.objects.filter(user=user).normalized_totals()
+    )
+
+    assert totals == [{
+        'name': 'продукт',
+        'measurement_unit': base_unit,
+        'total_amount': 3 * factor
+    }]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('units, expected', (
+    (('г', 'кг'), [('г', 2 + 2000)]),
+    (('мл', 'л'), [('мл', 2 + 2000)]),
+    (('шт', 'шт.'), [('шт.', 4)]),
+    (
+        ('ч. л.', 'ст. л.', 'стакан'),
+        [('ст. л.', 2), ('стакан', 2), ('ч. л.', 2)]
+    ),
+    (('г', 'мл'), [('г', 2), ('мл', 2)]),
+))
+def test_units_merge_only_within_their_base_unit(user, units, expected):
+    ShoppingCartIngredient.objects.bulk_create(
+        ShoppingCartIngredient(
+            user=user,
+            ingredient=Ingredient.objects.create(
+                name='продукт', measurement_unit=unit
+            ),
+            amount=2
+        )
+        for unit in units
+    )
+
+    totals = ShoppingCartIngredient.objects.filter(
+        user=user
+    ).normalized_totals()
+
+    assert sorted(
+        (total['measurement_unit'], total['total_amount'])
+        for total in totals
+    ) == expected
@@ -0,0 +1,27 @@
+import pytest
+from django.core.management import call_command
+
+from recipes.cache import get_cart_version_name, get_version
+from recipes.models import ShoppingCartIngredient, ShoppingList
+
+
+@pytest.mark.django_db
+def test_rebuild_restores_totals_and_bumps_cart_version(
+    user, create_recipes, django_capture_on_commit_callbacks
+):
+    recipe = create_recipes(user, 1)[0]
+    with django_capture_on_commit_callbacks(execute=True):
+        ShoppingList.objects.create(user=user, recipe=recipe)
+    expected = set(ShoppingCartIngredient.objects.values_list(
+        'ingredient_id', 'amount'
+    ))
+    ShoppingCartIngredient.objects.filter(user=user).update(amount=1)
+    version = get_version(get_cart_version_name(user.id))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('verify_shopping_carts', rebuild=True)
+
+    assert set(ShoppingCartIngredient.objects.values_list(
+        'ingredient_id', 'amount'
+    )) == expected
+    assert get_version(get_cart_version_name(user.id)) != version
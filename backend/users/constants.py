@@ -3,3 +3,7 @@ USERNAME_MAX_LENGTH = 150
 EMAIL_MAX_LENGTH = 254
 
 NAME_MAX_LENGTH = 150
+
+AUTHOR_FIELDS = frozenset(
+    ('email', 'username', 'first_name', 'last_name', 'avatar')
+)
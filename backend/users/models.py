@@ -2,7 +2,16 @@ from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 
-from .constants import EMAIL_MAX_LENGTH, NAME_MAX_LENGTH, USERNAME_MAX_LENGTH
+from recipes.constants import AVATAR_IMAGE_VARIANTS
+from recipes.images import schedule_variants
+from recipes.querysets import CreateOrIgnoreQuerySet
+
+from .constants import (
+    AUTHOR_FIELDS,
+    EMAIL_MAX_LENGTH,
+    NAME_MAX_LENGTH,
+    USERNAME_MAX_LENGTH
+)
 
 
 class User(AbstractUser):
@@ -29,6 +38,14 @@ class User(AbstractUser):
         blank=True,
         null=True
     )
+    recipes_count = models.PositiveIntegerField(
+        'Число рецептов',
+        default=0,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Число подписчиков',
+        default=0,
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
@@ -38,6 +55,18 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or AUTHOR_FIELDS.intersection(update_fields):
+            self.recipes.touch()
+            if update_fields is None or 'avatar' in update_fields:
+                schedule_variants(
+                    self.avatar,
+                    AVATAR_IMAGE_VARIANTS,
+                    self.recipes.touch
+                )
+
     def __str__(self):
         return self.username
 
@@ -56,6 +85,8 @@ class Subscription(models.Model):
         verbose_name='Автор'
     )
 
+    objects = CreateOrIgnoreQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'